@@ -0,0 +1,141 @@
+# artifacts.py
+"""
+Versioned binary artifacts for precomputed data (ocean grid, weather).
+
+Layout:
+    8 bytes   magic  b"RPLNART\\0"
+    4 bytes   container format version (uint32, little endian)
+    4 bytes   header length (uint32, little endian)
+    header    JSON: kind, version, meta, array table, payload checksum
+    payload   raw C-ordered arrays, each starting on a 64-byte boundary
+
+Loading memory-maps the file read-only, so start-up does not copy the
+arrays and every process mapping the same file shares its pages.
+"""
+
+import os
+import json
+import mmap
+import struct
+import hashlib
+import numpy as np
+
+MAGIC = b"RPLNART\0"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+_PREAMBLE = struct.Struct("<8sII")
+
+
+class Artifact:
+    def __init__(self, path, kind, version, meta, arrays, checksum):
+        self.path = path
+        self.kind = kind
+        self.version = version
+        self.meta = meta
+        self.arrays = arrays
+        self.checksum = checksum
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _raw(a):
+    # byte view of a contiguous array, without the copy tobytes() makes
+    return a.reshape(-1).view(np.uint8)
+
+
+# ================= WRITE =================
+
+def save_artifact(path, kind, version, arrays, meta=None):
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+
+    table = {}
+    offset = 0
+    digest = hashlib.sha256()
+    for name, a in arrays.items():
+        table[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset = _align(offset + a.nbytes)
+
+    # payload offsets are relative, so the checksum does not depend on the header
+    for a in arrays.values():
+        digest.update(_raw(a))
+        digest.update(b"\0" * (_align(a.nbytes) - a.nbytes))
+
+    header = json.dumps({
+        "kind": kind,
+        "version": version,
+        "meta": meta or {},
+        "arrays": table,
+        "checksum": digest.hexdigest(),
+    }).encode("utf-8")
+    payload_start = _align(_PREAMBLE.size + len(header))
+    header += b" " * (payload_start - _PREAMBLE.size - len(header))
+
+    # write to a temp file first so readers never map a half-written artifact
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for a in arrays.values():
+            f.write(_raw(a))
+            f.write(b"\0" * (_align(a.nbytes) - a.nbytes))
+    os.replace(tmp, path)
+
+    return digest.hexdigest()
+
+
+# ================= READ =================
+
+def load_artifact(path, kind, version, verify=False):
+    """
+    Map an artifact written by save_artifact(). Raises RuntimeError when
+    the file is not an artifact, was written for another kind/version
+    (stale), or is truncated. verify=True also re-hashes the payload.
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise RuntimeError(f"{path}: not a route planner artifact")
+
+        magic, format_version, header_len = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise RuntimeError(f"{path}: not a route planner artifact")
+        if format_version != FORMAT_VERSION:
+            raise RuntimeError(
+                f"{path}: artifact format v{format_version}, expected v{FORMAT_VERSION} - rebuild it"
+            )
+
+        header = json.loads(f.read(header_len))
+        if header["kind"] != kind or header["version"] != version:
+            raise RuntimeError(
+                f"{path}: stale artifact ({header['kind']} v{header['version']}, "
+                f"expected {kind} v{version}) - rebuild it"
+            )
+
+        payload_start = _PREAMBLE.size + header_len
+        payload_size = sum(
+            _align(int(np.prod(spec["shape"])) * np.dtype(spec["dtype"]).itemsize)
+            for spec in header["arrays"].values()
+        )
+        if os.fstat(f.fileno()).st_size != payload_start + payload_size:
+            raise RuntimeError(f"{path}: truncated artifact - rebuild it")
+
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if payload_size else b""
+
+    if verify and hashlib.sha256(mm[payload_start:]).hexdigest() != header["checksum"]:
+        raise RuntimeError(f"{path}: checksum mismatch - rebuild it")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        arrays[name] = np.frombuffer(
+            mm, dtype=dtype, count=count, offset=payload_start + spec["offset"],
+        ).reshape(tuple(spec["shape"]))
+
+    return Artifact(path, kind, version, header["meta"], arrays, header["checksum"])
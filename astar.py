@@ -1,9 +1,13 @@
 # astar.py
 
+import time
 import heapq
-from tqdm import tqdm
 from geoutils import haversine
-from config import GOAL_THRESHOLD_KM, MAX_EXPANSIONS
+from openlist import make_open_list
+from config import (
+    GOAL_THRESHOLD_KM, MAX_EXPANSIONS, OPEN_LIST, LOG_EVERY,
+    ANYTIME_EPSILON, ANYTIME_EPSILON_STEP,
+)
 
 
 # ================= HEURISTIC =================
@@ -25,8 +29,32 @@ def reconstruct_path(came_from, current):
 
 # ================= A* SEARCH =================
 
-def astar(start, goal, neighbor_fn, cost_fn, max_speed_kmph):
-    open_heap = [(0.0, start)]
+def astar(
+    start, goal, neighbor_fn, cost_fn, max_speed_kmph,
+    coord_fn=None, stats=None, heuristic_fn=None, max_expansions=MAX_EXPANSIONS,
+    open_list=OPEN_LIST, progress=None,
+):
+    # Nodes are opaque ids (OceanGrid node ids in the planner); coord_fn maps
+    # a node to (lat, lon) for the heuristic and goal test. stats, if given,
+    # is a dict that receives the expansion and cost_fn call counts.
+    # heuristic_fn(node, target) replaces the great-circle bound, e.g. with
+    # landmarks.AltHeuristic.
+    # max_expansions is the budget for this search (default MAX_EXPANSIONS);
+    # open_list names the priority queue (see openlist.OPEN_LISTS).
+    # progress(expansions, max_expansions, done), if given, is called every
+    # LOG_EVERY expansions and when the search ends (instrument.tqdm_progress).
+    if coord_fn is None:
+        coord_fn = lambda node: node
+
+    goal_coord = coord_fn(goal)
+
+    if heuristic_fn is None:
+        h = lambda node: heuristic(coord_fn(node), goal_coord, max_speed_kmph)
+    else:
+        h = lambda node: heuristic_fn(node, goal)
+
+    open_heap = make_open_list(open_list)
+    open_heap.push(start, 0.0)
     came_from = {}
     g_cost = {start: 0.0}
     
@@ -34,32 +62,25 @@ def astar(start, goal, neighbor_fn, cost_fn, max_speed_kmph):
     closed_set = set()
 
     expansions = 0
+    cost_calls = 0
 
-    pbar = tqdm(
-        total=MAX_EXPANSIONS,
-        desc="A* Search",
-        unit="nodes",
-        dynamic_ncols=True,
-    )
 
     while open_heap:
-        _, current = heapq.heappop(open_heap)
-        
-        # Skip if already expanded
-        if current in closed_set:
-            continue
-        
+        _, current = open_heap.pop()
         closed_set.add(current)
         expansions += 1
-        pbar.update(1)
+        if progress is not None and expansions % LOG_EVERY == 0:
+            progress(expansions, max_expansions, False)
 
-        if expansions >= MAX_EXPANSIONS:
-            pbar.close()
-            raise RuntimeError(f"A* expansion limit exceeded ({MAX_EXPANSIONS:,} nodes)")
+        if expansions >= max_expansions:
+            _done(progress, expansions, max_expansions)
+            _record(stats, expansions, cost_calls, open_heap)
+            raise RuntimeError(f"A* expansion limit exceeded ({max_expansions:,} nodes)")
 
         # Goal check
-        if haversine(current, goal) <= GOAL_THRESHOLD_KM:
-            pbar.close()
+        if haversine(coord_fn(current), goal_coord) <= GOAL_THRESHOLD_KM:
+            _done(progress, expansions, max_expansions)
+            _record(stats, expansions, cost_calls, open_heap)
             print(f"[A*] Goal reached after {expansions:,} expansions")
             return reconstruct_path(came_from, current)
 
@@ -67,13 +88,398 @@ def astar(start, goal, neighbor_fn, cost_fn, max_speed_kmph):
             if neighbor in closed_set:
                 continue
                 
+            cost_calls += 1
             tentative_g = g_cost[current] + cost_fn(current, neighbor)
 
             if neighbor not in g_cost or tentative_g < g_cost[neighbor]:
                 g_cost[neighbor] = tentative_g
-                f = tentative_g + heuristic(neighbor, goal, max_speed_kmph)
-                heapq.heappush(open_heap, (f, neighbor))
+                f = tentative_g + h(neighbor)
+                open_heap.push(neighbor, f)
                 came_from[neighbor] = current
 
-    pbar.close()
-    raise RuntimeError("No route found - search space exhausted")
\ No newline at end of file
+    _done(progress, expansions, max_expansions)
+    _record(stats, expansions, cost_calls, open_heap)
+    raise RuntimeError("No route found - search space exhausted")
+
+
+# ================= ANYTIME (ARA*) =================
+
+def ara_star(
+    start, goal, neighbor_fn, cost_fn, max_speed_kmph,
+    coord_fn=None, stats=None, heuristic_fn=None, max_expansions=MAX_EXPANSIONS,
+    open_list=OPEN_LIST, progress=None, epsilon=ANYTIME_EPSILON, deadline_s=None,
+):
+    """
+    Anytime Repairing A*: weighted A* (f = g + epsilon * h) finds a first
+    route quickly, then epsilon drops by ANYTIME_EPSILON_STEP and the
+    search is repaired, reusing its g values, until epsilon reaches 1 or
+    deadline_s seconds have passed. Returns the best route found; stats
+    also receives "suboptimality", the proven bound on its cost relative
+    to the optimum (1.0 = optimal).
+
+    The deadline only cuts improvement short: the first route is always
+    completed, within max_expansions (counted over all iterations).
+    """
+    if coord_fn is None:
+        coord_fn = lambda node: node
+
+    t_end = None if deadline_s is None else time.perf_counter() + deadline_s
+    goal_coord = coord_fn(goal)
+
+    if heuristic_fn is None:
+        base_h = lambda node: heuristic(coord_fn(node), goal_coord, max_speed_kmph)
+    else:
+        base_h = lambda node: heuristic_fn(node, goal)
+
+    h_cache = {}
+
+    def h(node):
+        v = h_cache.get(node)
+        if v is None:
+            v = h_cache[node] = base_h(node)
+        return v
+
+    came_from = {}
+    g_cost = {start: 0.0}
+    open_heap = make_open_list(open_list)
+    open_heap.push(start, 0.0)
+    closed_set = set()
+    incons = set()       # improved after being expanded in this iteration
+
+    eps = max(1.0, epsilon)
+    best_path = None
+    bound = float("inf")
+    expansions = 0
+    cost_calls = 0
+    out_of_time = False
+
+
+    while True:
+        reached = None
+
+        while open_heap:
+            _, current = open_heap.pop()
+
+            # goal stays open so the next iteration can improve on it
+            if haversine(coord_fn(current), goal_coord) <= GOAL_THRESHOLD_KM:
+                reached = current
+                break
+
+            closed_set.add(current)
+            expansions += 1
+            if progress is not None and expansions % LOG_EVERY == 0:
+                progress(expansions, max_expansions, False)
+
+            if expansions >= max_expansions:
+                if best_path is None:
+                    _done(progress, expansions, max_expansions)
+                    _record(stats, expansions, cost_calls, open_heap)
+                    raise RuntimeError(f"A* expansion limit exceeded ({max_expansions:,} nodes)")
+                out_of_time = True
+                break
+
+            if (
+                t_end is not None and best_path is not None and
+                expansions % 256 == 0 and time.perf_counter() > t_end
+            ):
+                out_of_time = True
+                break
+
+            for neighbor in neighbor_fn(current):
+                cost_calls += 1
+                tentative_g = g_cost[current] + cost_fn(current, neighbor)
+
+                if neighbor not in g_cost or tentative_g < g_cost[neighbor]:
+                    g_cost[neighbor] = tentative_g
+                    came_from[neighbor] = current
+                    if neighbor in closed_set:
+                        incons.add(neighbor)
+                    else:
+                        open_heap.push(neighbor, tentative_g + eps * h(neighbor))
+
+        if out_of_time:
+            break
+
+        if reached is None:
+            if best_path is None:
+                _done(progress, expansions, max_expansions)
+                _record(stats, expansions, cost_calls, open_heap)
+                raise RuntimeError("No route found - search space exhausted")
+            break
+
+        # epsilon' = g(goal) / min(g + h) over the frontier, capped by epsilon
+        best_path = reconstruct_path(came_from, reached)
+        frontier = set(open_heap) | incons
+        frontier.add(reached)
+        lower = min(g_cost[n] + h(n) for n in frontier)
+        bound = max(1.0, min(eps, g_cost[reached] / lower if lower > 0 else 1.0))
+
+        if bound <= 1.0 or (t_end is not None and time.perf_counter() > t_end):
+            break
+        eps = max(1.0, min(eps - ANYTIME_EPSILON_STEP, bound))
+
+        # reorder the frontier under the new epsilon
+        open_heap.record(stats)
+        open_heap = make_open_list(open_list)
+        for n in frontier:
+            open_heap.push(n, g_cost[n] + eps * h(n))
+        closed_set = set()
+        incons = set()
+
+    _done(progress, expansions, max_expansions)
+    _record(stats, expansions, cost_calls, open_heap)
+    if stats is not None:
+        stats["suboptimality"] = max(stats.get("suboptimality", 1.0), bound)
+
+    print(f"[A*] Goal reached after {expansions:,} expansions (anytime, within {bound:.3f}x of optimal)")
+    return best_path
+
+
+# ================= ANY-ANGLE (THETA*) =================
+
+def theta_star(
+    start, goal, neighbor_fn, cost_fn, max_speed_kmph,
+    coord_fn=None, stats=None, heuristic_fn=None, segment_fn=None,
+    max_expansions=MAX_EXPANSIONS, open_list=OPEN_LIST, progress=None,
+):
+    """
+    Theta*: A* where a node may take its neighbour's parent as its own
+    parent when the straight segment between them is clear, so paths only
+    bend at obstacles instead of following the 8 grid directions.
+    segment_fn(a, b) returns the cost of the straight segment a-b, or None
+    when it is blocked; without it this is plain A*. A neighbour keeps
+    the cheaper of the two (through the node or straight from its
+    parent). The returned path holds the turning points only.
+    """
+    if coord_fn is None:
+        coord_fn = lambda node: node
+
+    goal_coord = coord_fn(goal)
+
+    if heuristic_fn is None:
+        h = lambda node: heuristic(coord_fn(node), goal_coord, max_speed_kmph)
+    else:
+        h = lambda node: heuristic_fn(node, goal)
+
+    open_heap = make_open_list(open_list)
+    open_heap.push(start, 0.0)
+    came_from = {}
+    g_cost = {start: 0.0}
+    closed_set = set()
+
+    expansions = 0
+    cost_calls = 0
+
+
+    while open_heap:
+        _, current = open_heap.pop()
+        closed_set.add(current)
+        expansions += 1
+        if progress is not None and expansions % LOG_EVERY == 0:
+            progress(expansions, max_expansions, False)
+
+        if expansions >= max_expansions:
+            _done(progress, expansions, max_expansions)
+            _record(stats, expansions, cost_calls, open_heap)
+            raise RuntimeError(f"A* expansion limit exceeded ({max_expansions:,} nodes)")
+
+        if haversine(coord_fn(current), goal_coord) <= GOAL_THRESHOLD_KM:
+            _done(progress, expansions, max_expansions)
+            _record(stats, expansions, cost_calls, open_heap)
+            print(f"[A*] Goal reached after {expansions:,} expansions (any-angle)")
+            return reconstruct_path(came_from, current)
+
+        parent = came_from.get(current)
+
+        for neighbor in neighbor_fn(current):
+            if neighbor in closed_set:
+                continue
+
+            # path 1: through current
+            cost_calls += 1
+            via, tentative_g = current, g_cost[current] + cost_fn(current, neighbor)
+
+            # path 2: straight from the parent, skipping current, when it is
+            # clear and cheaper (costs vary with the weather along it)
+            if parent is not None and segment_fn is not None:
+                segment = segment_fn(parent, neighbor)
+                if segment is not None and g_cost[parent] + segment < tentative_g:
+                    via, tentative_g = parent, g_cost[parent] + segment
+
+            if neighbor not in g_cost or tentative_g < g_cost[neighbor]:
+                g_cost[neighbor] = tentative_g
+                came_from[neighbor] = via
+                open_heap.push(neighbor, tentative_g + h(neighbor))
+
+    _done(progress, expansions, max_expansions)
+    _record(stats, expansions, cost_calls, open_heap)
+    raise RuntimeError("No route found - search space exhausted")
+
+
+# ================= BIDIRECTIONAL A* =================
+
+def bidirectional_astar(
+    start, goal, neighbor_fn, cost_fn, max_speed_kmph,
+    coord_fn=None, stats=None, heuristic_fn=None, max_expansions=MAX_EXPANSIONS,
+    open_list=OPEN_LIST, progress=None,
+):
+    """
+    Forward search from start and backward search from goal, meeting in
+    the middle. Same arguments and path contract as astar(); the backward
+    side relaxes edges with cost_fn(u, v) for its predecessor u, so
+    asymmetric costs stay exact. neighbor_fn must be symmetric.
+
+    Both sides use the average potential p(v) = (h(v, goal) - h(v, start)) / 2
+    (and -p backwards), which keeps both consistent; the search stops
+    once the two smallest keys add up to the best meeting cost found.
+    """
+    if coord_fn is None:
+        coord_fn = lambda node: node
+
+    if start == goal:
+        _record(stats, 0, 0)
+        return [start]
+
+    if heuristic_fn is None:
+        start_coord = coord_fn(start)
+        goal_coord = coord_fn(goal)
+        heuristic_fn = lambda node, target: heuristic(
+            coord_fn(node), goal_coord if target == goal else start_coord, max_speed_kmph,
+        )
+
+    potentials = {}
+
+    def potential(node):
+        p = potentials.get(node)
+        if p is None:
+            p = potentials[node] = (heuristic_fn(node, goal) - heuristic_fn(node, start)) / 2
+        return p
+
+    # index 0 = forward (start -> goal), 1 = backward (goal -> start)
+    heaps = (make_open_list(open_list), make_open_list(open_list))
+    heaps[0].push(start, potential(start))
+    heaps[1].push(goal, -potential(goal))
+    g_costs = ({start: 0.0}, {goal: 0.0})
+    parents = ({}, {})
+    closed = (set(), set())
+    signs = (1, -1)
+
+    best = float("inf")
+    meet = None
+    expansions = 0
+    cost_calls = 0
+
+
+    while heaps[0] and heaps[1]:
+        if heaps[0].peek_key() + heaps[1].peek_key() >= best:
+            break
+
+        # grow the smaller frontier
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        heap, g_cost, parent, done = heaps[side], g_costs[side], parents[side], closed[side]
+        other_g = g_costs[1 - side]
+        sign = signs[side]
+
+        _, current = heap.pop()
+        done.add(current)
+        expansions += 1
+        if progress is not None and expansions % LOG_EVERY == 0:
+            progress(expansions, max_expansions, False)
+
+        if expansions >= max_expansions:
+            _done(progress, expansions, max_expansions)
+            _record(stats, expansions, cost_calls, *heaps)
+            raise RuntimeError(f"A* expansion limit exceeded ({max_expansions:,} nodes)")
+
+        g_current = g_cost[current]
+        for neighbor in neighbor_fn(current):
+            if neighbor in done:
+                continue
+
+            cost_calls += 1
+            if side == 0:
+                tentative_g = g_current + cost_fn(current, neighbor)
+            else:
+                tentative_g = g_current + cost_fn(neighbor, current)
+
+            if neighbor not in g_cost or tentative_g < g_cost[neighbor]:
+                g_cost[neighbor] = tentative_g
+                parent[neighbor] = current
+                heap.push(neighbor, tentative_g + sign * potential(neighbor))
+
+                if neighbor in other_g and tentative_g + other_g[neighbor] < best:
+                    best = tentative_g + other_g[neighbor]
+                    meet = neighbor
+
+    _done(progress, expansions, max_expansions)
+    _record(stats, expansions, cost_calls, *heaps)
+
+    if meet is None:
+        raise RuntimeError("No route found - search space exhausted")
+
+    print(f"[A*] Goal reached after {expansions:,} expansions (bidirectional)")
+    forward = reconstruct_path(parents[0], meet)
+    backward = reconstruct_path(parents[1], meet)
+    return forward + backward[::-1][1:]
+
+
+# ================= DIJKSTRA =================
+
+def dijkstra(sources, neighbor_fn, cost_fn, num_nodes, targets=None, reverse=False):
+    """
+    Multi-source Dijkstra over integer node ids in [0, num_nodes).
+    Returns (dist, parent) lists indexed by node id; unreached nodes keep
+    inf / -1. Stops early once every node in targets is settled.
+    reverse=True relaxes cost_fn(neighbor, node), giving costs *to* the
+    sources instead of from them (parent then points towards a source).
+    """
+    inf = float("inf")
+    dist = [inf] * num_nodes
+    parent = [-1] * num_nodes
+    settled = bytearray(num_nodes)
+
+    heap = []
+    for s in sources:
+        dist[s] = 0.0
+        heap.append((0.0, s))
+    heapq.heapify(heap)
+
+    remaining = set(targets) if targets is not None else None
+
+    while heap:
+        d, current = heapq.heappop(heap)
+        if settled[current]:
+            continue
+        settled[current] = 1
+
+        if remaining is not None:
+            remaining.discard(current)
+            if not remaining:
+                break
+
+        for neighbor in neighbor_fn(current):
+            if settled[neighbor]:
+                continue
+            if reverse:
+                nd = d + cost_fn(neighbor, current)
+            else:
+                nd = d + cost_fn(current, neighbor)
+            if nd < dist[neighbor]:
+                dist[neighbor] = nd
+                parent[neighbor] = current
+                heapq.heappush(heap, (nd, neighbor))
+
+    return dist, parent
+
+
+def _done(progress, expansions, total):
+    if progress is not None:
+        progress(expansions, total, True)
+
+
+def _record(stats, expansions, cost_calls, *open_lists):
+    if stats is not None:
+        stats["expansions"] = stats.get("expansions", 0) + expansions
+        stats["cost_calls"] = stats.get("cost_calls", 0) + cost_calls
+        for open_list in open_lists:
+            open_list.record(stats)
\ No newline at end of file
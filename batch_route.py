@@ -0,0 +1,206 @@
+# batch_route.py
+"""
+Non-interactive batch routing.
+
+Reads port pairs from a CSV (columns start_lat, start_lon, goal_lat,
+goal_lon and optionally id) or a JSONL file ({"id", "start": [lat, lon],
+"goal": [lat, lon]}), routes them on a pool of worker processes and
+appends one JSON line per route to the output as soon as it is done.
+Every worker maps the same grid / weather artifacts, so their pages are
+shared through the page cache.
+
+Pairs without an id are numbered by their position in the input. Pairs
+whose id is already in the output are skipped, so an interrupted run is
+resumed by starting it again with the same arguments.
+
+    python batch_route.py pairs.csv -o routes.jsonl --workers 4
+"""
+
+import os
+import io
+import csv
+import sys
+import json
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from planner import Planner, SEARCH_MODES
+from route_cache import RouteCache
+from config import MAX_EXPANSIONS, ROUTE_CACHE_FILE
+
+REPORT_EVERY_S = 10.0
+
+
+# ================= INPUT / OUTPUT =================
+
+def read_pairs(path):
+    # yields (id, start, goal); ids are strings so they compare with the output
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            for n, row in enumerate(csv.DictReader(f), 1):
+                try:
+                    start = (float(row["start_lat"]), float(row["start_lon"]))
+                    goal = (float(row["goal_lat"]), float(row["goal_lon"]))
+                except (KeyError, TypeError, ValueError):
+                    raise ValueError(f"{path}: bad pair on row {n}: {row}")
+                yield str(row.get("id") or n), start, goal
+        else:
+            for n, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    start = tuple(float(x) for x in row["start"])
+                    goal = tuple(float(x) for x in row["goal"])
+                except (KeyError, TypeError, ValueError):
+                    raise ValueError(f"{path}: bad pair on line {n}: {line.strip()}")
+                yield str(row.get("id", n)), start, goal
+
+
+def done_ids(path):
+    # ids already written by an earlier run; a line torn by an interrupted
+    # run is cut off so the next record starts on a line of its own
+    ids = set()
+    if not os.path.exists(path):
+        return ids
+    with open(path, "rb+") as f:
+        data = f.read()
+        keep = data.rfind(b"\n") + 1
+        if keep < len(data):
+            f.truncate(keep)
+    for line in data[:keep].splitlines():
+        try:
+            ids.add(str(json.loads(line)["id"]))
+        except (ValueError, KeyError):
+            pass
+    return ids
+
+
+# ================= WORKERS =================
+
+_planner = None
+_options = None
+
+def _init_worker(options, cache=False, quiet=True):
+    # one planner per process; the route cache file is shared by all of them
+    global _planner, _options
+    route_cache = RouteCache(ROUTE_CACHE_FILE) if cache else None
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        _planner = Planner(leg_workers=0, route_cache=route_cache).warmup()
+    _options = options
+
+
+def _route(pair_id, start, goal):
+    # one output record; a route that cannot be found is a record too
+    record = {"id": pair_id, "start": start, "goal": goal}
+    options = dict(_options)
+    paths = options.pop("paths")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = _planner.compute_route(start, goal, **options)
+    except RuntimeError as e:
+        record["error"] = str(e)
+        return record
+
+    record.update(
+        travel_time_hours=result["travel_time_hours"],
+        canals=[c["canal"] for c in result["canal_jumps"]],
+        num_waypoints_smooth=result["num_waypoints_smooth"],
+        max_storm_risk=result["max_storm_risk"],
+        total_s=result["stats"]["total_s"],
+    )
+    if "cache" in result["stats"]:
+        record["cache"] = result["stats"]["cache"]
+    if paths:
+        record["route_smooth"] = result["route_smooth"]
+    return record
+
+
+# ================= BATCH =================
+
+def run_batch(pairs_file, output, workers, options, cache=False):
+    done = done_ids(output)
+    pairs = (p for p in read_pairs(pairs_file) if p[0] not in done)
+    if done:
+        print(f"[INFO] Resuming: {len(done):,} routes already in {output}")
+
+    # the parent loads (and, if stale, rebuilds) the shared artifacts once
+    # before the workers map them
+    _init_worker(options, cache, quiet=False)
+
+    routed = failed = 0
+    t_begin = last_report = time.perf_counter()
+
+    def write(out, record):
+        nonlocal routed, failed, last_report
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        routed += 1
+        failed += "error" in record
+        now = time.perf_counter()
+        if now - last_report >= REPORT_EVERY_S:
+            last_report = now
+            print(f"[INFO] {routed:,} routes, {routed / (now - t_begin):.2f} routes/s")
+
+    with open(output, "a") as out:
+        if workers <= 1:
+            for pair in pairs:
+                write(out, _route(*pair))
+        else:
+            with ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(options, cache),
+            ) as pool:
+                # a few pairs per worker in flight keeps every process busy
+                # without reading the whole input up front
+                running = set()
+                for pair in pairs:
+                    running.add(pool.submit(_route, *pair))
+                    if len(running) >= 4 * workers:
+                        finished, running = wait(running, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            write(out, future.result())
+                for future in wait(running).done:
+                    write(out, future.result())
+
+    elapsed = time.perf_counter() - t_begin
+    rate = routed / elapsed if elapsed > 0 else 0.0
+    print(f"[OK] {routed:,} routes ({failed:,} failed) in {elapsed:.1f}s "
+          f"- {rate:.2f} routes/s → {output}")
+    return routed, failed, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Route a file of port pairs.")
+    parser.add_argument("pairs", help="CSV or JSONL file of start / goal pairs")
+    parser.add_argument("-o", "--output", default="routes.jsonl",
+                        help="JSON-lines results, appended to (default routes.jsonl)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: CPU count, 0/1 = in-process)")
+    parser.add_argument("--search", default="astar", choices=SEARCH_MODES)
+    parser.add_argument("--portfolio", action="store_true",
+                        help="try every canal option instead of region boxes")
+    parser.add_argument("--coarse-to-fine", action="store_true")
+    parser.add_argument("--max-expansions", type=int, default=MAX_EXPANSIONS)
+    parser.add_argument("--no-smooth", action="store_true")
+    parser.add_argument("--paths", action="store_true", help="include route_smooth")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"reuse and fill the route cache ({ROUTE_CACHE_FILE})")
+    args = parser.parse_args(argv)
+
+    options = {
+        "smooth": not args.no_smooth,
+        "search": args.search,
+        "coarse_to_fine": args.coarse_to_fine,
+        "max_expansions": args.max_expansions,
+        "portfolio": args.portfolio,
+        "paths": args.paths,
+    }
+    try:
+        run_batch(args.pairs, args.output, args.workers, options, args.cache)
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
-import xarray as xr
-
 class Bathymetry:
     def __init__(self, nc_path: str):
+        # xarray is slow to import and only needed when building the grid
+        import xarray as xr
+
         self.ds = xr.open_dataset(nc_path)
         self.depth = self.ds["elevation"]  # meters
 
@@ -0,0 +1,816 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the route planner.
+Run: python benchmark.py <name>   (see BENCHMARKS at the bottom)
+"""
+
+import sys
+import time
+import pickle
+import tracemalloc
+from collections import deque
+
+
+# ================= HELPERS =================
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+def expand_bfs(start, neighbor_fn, limit):
+    # neighbour generation only, the part of an A* step that depends on the grid
+    seen = {start}
+    queue = deque([start])
+    expansions = 0
+
+    while queue and expansions < limit:
+        node = queue.popleft()
+        expansions += 1
+        for n in neighbor_fn(node):
+            if n not in seen:
+                seen.add(n)
+                queue.append(n)
+
+    return expansions
+
+
+# ================= GRID REPRESENTATION =================
+
+def bench_grid(nodes_file="valid_nodes_world.pkl", expansions=200_000):
+    from grid import OceanGrid, get_neighbors
+
+    # ---------- memory ----------
+    # legacy planner: unpickled tuples + set(VALID_NODES_LIST)
+    tracemalloc.start()
+    with open(nodes_file, "rb") as f:
+        nodes_list = list(pickle.load(f))
+    valid_nodes = set(nodes_list)
+    set_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    grid, build_s = timed(OceanGrid.from_nodes, nodes_list)
+
+    print("=" * 70)
+    print("GRID REPRESENTATION")
+    print("=" * 70)
+    print(f"Valid nodes            : {len(valid_nodes):,}")
+    print(f"Raster                 : {grid.n_lat} x {grid.n_lon} cells")
+    print(f"set of float tuples    : {set_bytes / 1e6:8.1f} MB")
+    print(f"OceanGrid raster       : {grid.mask.nbytes / 1e6:8.1f} MB  (built in {build_s:.2f}s)")
+
+    # ---------- neighbour expansion throughput ----------
+    start = nodes_list[len(nodes_list) // 2]
+
+    def legacy_neighbors(node):
+        return [n for n in get_neighbors(node) if n in valid_nodes]
+
+    n_legacy, t_legacy = timed(expand_bfs, start, legacy_neighbors, expansions)
+    n_grid, t_grid = timed(expand_bfs, grid.node_id(*start), grid.neighbors, expansions)
+
+    print()
+    print(f"set + float tuples     : {n_legacy / t_legacy:12,.0f} expansions/s")
+    print(f"OceanGrid node ids     : {n_grid / t_grid:12,.0f} expansions/s")
+    print(f"Speed-up               : {(n_grid / t_grid) / (n_legacy / t_legacy):.1f}x")
+    print("=" * 70)
+
+
+# ================= SNAPPING =================
+
+def bench_snap(nodes_file="valid_nodes_world.pkl", queries=20, batch=5000):
+    import random
+    import numpy as np
+    from grid import OceanGrid
+
+    with open(nodes_file, "rb") as f:
+        nodes_list = list(pickle.load(f))
+    valid_nodes = set(nodes_list)
+    grid = OceanGrid.from_nodes(nodes_list)
+
+    # bulk jobs repeat the same few hundred ports
+    rng = random.Random(0)
+    ports = [(rng.uniform(-70, 70), rng.uniform(-180, 180)) for _ in range(500)]
+    points = [rng.choice(ports) for _ in range(batch)]
+
+    def legacy_snap(point):
+        lat, lon = point
+        return min(valid_nodes, key=lambda v: (v[0] - lat) ** 2 + (v[1] - lon) ** 2)
+
+    _, t_legacy = timed(lambda: [legacy_snap(p) for p in points[:queries]])
+    _, t_ring = timed(lambda: [grid.nearest_node(*p) for p in points])
+    lats, lons = np.array(points).T
+    _, t_batch = timed(grid.nearest_nodes, lats, lons)
+
+    print("=" * 70)
+    print("SNAP TO VALID NODE")
+    print("=" * 70)
+    print(f"linear min() over set  : {t_legacy / queries * 1e3:10.2f} ms/point")
+    print(f"raster window search   : {t_ring / batch * 1e6:10.2f} us/point")
+    print(f"nearest_nodes (batch)  : {t_batch / batch * 1e6:10.2f} us/point  ({batch:,} points)")
+    print("=" * 70)
+
+
+# ================= STARTUP =================
+
+def bench_startup(nodes_file="valid_nodes_world.pkl"):
+    import os
+    from grid import OceanGrid
+    from weather import WeatherField
+    from config import GRID_FILE, WEATHER_CACHE_FILE
+
+    print("=" * 70)
+    print("ARTIFACT LOADING")
+    print("=" * 70)
+
+    if os.path.exists(nodes_file):
+        def load_pickle():
+            with open(nodes_file, "rb") as f:
+                return set(pickle.load(f))
+
+        _, t_pickle = timed(load_pickle)
+        print(f"pickle + set()         : {t_pickle * 1e3:10.1f} ms  ({nodes_file})")
+
+    _, t_grid = timed(OceanGrid.load, GRID_FILE)
+    _, t_weather = timed(WeatherField, WEATHER_CACHE_FILE)
+    print(f"OceanGrid.load (mmap)  : {t_grid * 1e3:10.1f} ms  ({GRID_FILE})")
+    print(f"WeatherField (mmap)    : {t_weather * 1e3:10.1f} ms  ({WEATHER_CACHE_FILE})")
+    print("=" * 70)
+
+
+# ================= IMPORT TIME =================
+
+def bench_import(repeat=5):
+    import subprocess
+
+    def run(code):
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+            best = min(best, time.perf_counter() - t0)
+        return best
+
+    baseline = run("pass")
+    rows = [
+        ("import planner", "import planner"),
+        ("import main", "import main"),
+        ("import storm_config", "import storm_config"),
+        ("Planner().warmup()", "import planner; planner.Planner().warmup()"),
+    ]
+
+    print("=" * 70)
+    print(f"IMPORT TIME (best of {repeat}, interpreter start-up subtracted)")
+    print("=" * 70)
+    for label, code in rows:
+        print(f"{label:<23}: {(run(code) - baseline) * 1e3:10.1f} ms")
+    print("=" * 70)
+
+
+# ================= SEARCH ALGORITHMS =================
+
+def bench_search(modes=("astar", "bidirectional", "ch"), cases=None):
+    # expansions and wall time per search mode on the test_routes cases
+    import contextlib
+    import io
+    from planner import default_planner
+    from test_routes import TEST_CASES
+
+    planner = default_planner().warmup()
+    cases = cases or TEST_CASES
+
+    print("=" * 70)
+    print("SEARCH ALGORITHMS (test_routes.TEST_CASES)")
+    print("=" * 70)
+
+    for case in cases:
+        print(case["name"])
+        for mode in modes:
+            stats = {}
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result, seconds = timed(
+                        planner.compute_route, case["start"], case["goal"],
+                        search=mode, stats=stats,
+                    )
+                eta = f"{result['travel_time_hours']:9.2f} h"
+            except RuntimeError as e:
+                seconds, eta = float("nan"), str(e)
+
+            print(f"  {mode:<14}: {stats.get('expansions', 0):>9,} expansions "
+                  f"{seconds:8.2f} s   {eta}")
+    print("=" * 70)
+
+
+# ================= ANY-ANGLE =================
+
+def bench_anyangle(cases=None):
+    # A* + Douglas-Peucker pipeline vs Theta* on the test_routes cases
+    import contextlib
+    import io
+    from planner import default_planner
+    from smoothing import douglas_peucker
+    from test_routes import TEST_CASES
+
+    planner = default_planner().warmup()
+    cases = cases or TEST_CASES
+
+    print("=" * 70)
+    print("ANY-ANGLE SEARCH (test_routes.TEST_CASES)")
+    print("=" * 70)
+    print(f"  {'mode':<7}{'expansions':>11}{'search':>9}{'raw wp':>8}"
+          f"{'smooth wp':>10}{'D-P':>9}{'ETA':>11}")
+
+    for case in cases:
+        print(case["name"])
+        for mode in ("astar", "theta"):
+            stats = {}
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result, seconds = timed(
+                        planner.compute_route, case["start"], case["goal"],
+                        search=mode, stats=stats,
+                    )
+            except RuntimeError as e:
+                print(f"  {mode:<7}{stats.get('expansions', 0):>11,}  {e}")
+                continue
+
+            _, t_dp = timed(douglas_peucker, result["route_raw"], 10.0)
+            print(f"  {mode:<7}{stats['expansions']:>11,}{seconds:>8.2f}s"
+                  f"{result['num_waypoints_raw']:>8,}{result['num_waypoints_smooth']:>10,}"
+                  f"{t_dp * 1e3:>7.1f}ms{result['travel_time_hours']:>9.2f} h")
+    print("=" * 70)
+
+
+# ================= COARSE-TO-FINE =================
+
+LONG_HAUL_CASES = [
+    {"name": "Mumbai → Perth", "start": (18.90, 72.80), "goal": (-32.00, 115.70)},
+    {"name": "Cape Town → Singapore", "start": (-33.90, 18.40), "goal": (1.26, 103.80)},
+    {"name": "Los Angeles → Sydney", "start": (33.70, -118.30), "goal": (-33.85, 151.25)},
+    {"name": "Lisbon → Rio de Janeiro", "start": (38.70, -9.20), "goal": (-22.90, -43.15)},
+]
+
+
+def bench_coarse(cases=None):
+    # plain fine-grid A* vs coarse-to-fine corridor search on long-haul legs
+    import contextlib
+    import io
+    from planner import default_planner
+    from test_routes import TEST_CASES
+
+    planner = default_planner().warmup()
+    _, t_derive = timed(lambda: planner.coarse_grids)
+    cases = cases or TEST_CASES + LONG_HAUL_CASES
+
+    print("=" * 70)
+    print(f"COARSE-TO-FINE SEARCH (coarse grids derived in {t_derive:.2f}s)")
+    print("=" * 70)
+
+    for case in cases:
+        print(case["name"])
+        for label, coarse_to_fine in (("fine grid", False), ("coarse-to-fine", True)):
+            stats = {}
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result, seconds = timed(
+                        planner.compute_route, case["start"], case["goal"],
+                        stats=stats, coarse_to_fine=coarse_to_fine,
+                    )
+                eta = f"{result['travel_time_hours']:9.2f} h"
+            except RuntimeError as e:
+                seconds, eta = float("nan"), str(e)
+
+            print(f"  {label:<14}: {stats.get('expansions', 0):>9,} expansions "
+                  f"{seconds:8.2f} s   {eta}")
+    print("=" * 70)
+
+
+# ================= ANYTIME SEARCH =================
+
+def bench_anytime(deadlines=(0.0, 1.0, 5.0), cases=None):
+    # optimal A* vs ARA* stopped at a few deadlines (0 = first route only)
+    import contextlib
+    import io
+    from planner import default_planner
+    from test_routes import TEST_CASES
+
+    planner = default_planner().warmup()
+    cases = cases or TEST_CASES + LONG_HAUL_CASES
+    runs = [("astar", {})] + [
+        (f"deadline {d:g} s", {"deadline_s": d}) for d in deadlines
+    ]
+
+    print("=" * 70)
+    print("ANYTIME SEARCH (ARA*, bound = proven cost / optimum)")
+    print("=" * 70)
+
+    for case in cases:
+        print(case["name"])
+        for label, kwargs in runs:
+            stats = {}
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result, seconds = timed(
+                        planner.compute_route, case["start"], case["goal"],
+                        stats=stats, **kwargs,
+                    )
+                eta = f"{result['travel_time_hours']:9.2f} h"
+                bound = result.get("suboptimality_bound")
+                if bound is not None:
+                    eta += f"  (bound {bound:.3f})"
+            except RuntimeError as e:
+                seconds, eta = float("nan"), str(e)
+
+            print(f"  {label:<14}: {stats.get('expansions', 0):>9,} expansions "
+                  f"{seconds:8.2f} s   {eta}")
+    print("=" * 70)
+
+
+# ================= OPEN LIST =================
+
+def bench_openlist(modes=("astar", "bidirectional"), cases=None):
+    # lazy-deletion heapq vs indexed heap with decrease-key, same searches
+    import contextlib
+    import io
+    from planner import default_planner
+    from openlist import OPEN_LISTS
+    from test_routes import TEST_CASES
+
+    planner = default_planner().warmup()
+    cases = cases or TEST_CASES + LONG_HAUL_CASES
+    kinds = list(OPEN_LISTS)
+
+    print("=" * 70)
+    print("OPEN LIST (pushes / decrease-keys / stale pops / peak size)")
+    print("=" * 70)
+
+    for case in cases:
+        print(case["name"])
+        for mode in modes:
+            for kind in kinds:
+                planner.open_list = kind
+                stats = {}
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        result, seconds = timed(
+                            planner.compute_route, case["start"], case["goal"],
+                            search=mode, stats=stats,
+                        )
+                    eta = f"{result['travel_time_hours']:.2f} h"
+                except RuntimeError as e:
+                    seconds, eta = float("nan"), str(e)
+
+                print(f"  {mode + '/' + kind:<22}: {stats.get('expansions', 0):>7,} exp "
+                      f"{stats.get('open_pushes', 0):>8,} {stats.get('open_decrease_keys', 0):>7,} "
+                      f"{stats.get('open_stale_pops', 0):>7,} {stats.get('open_peak', 0):>7,} "
+                      f"{seconds:6.2f} s  {eta}")
+    planner.open_list = kinds[0]
+    print("=" * 70)
+
+
+# ================= CANAL LEGS =================
+
+CANAL_CASES = [
+    {"name": "Los Angeles → New York (Panama)", "start": (34.05, -118.24), "goal": (40.71, -74.01)},
+    {"name": "Mumbai → Rotterdam (Suez)", "start": (18.90, 72.80), "goal": (51.92, 4.48)},
+    {"name": "Shanghai → Genoa (Suez)", "start": (31.23, 121.47), "goal": (44.41, 8.93)},
+]
+
+
+def bench_legs(workers=2, repeat=3, cases=None):
+    # canal routes with both legs in-process vs on a pool of leg workers
+    import contextlib
+    import io
+    import os
+    from planner import Planner
+
+    cases = cases or CANAL_CASES
+    planners = {
+        "sequential": Planner(leg_workers=0).warmup(),
+        f"{workers} workers": Planner(leg_workers=workers).warmup(),
+    }
+
+    print("=" * 70)
+    print(f"CANAL LEGS (best of {repeat}, {os.cpu_count()} CPUs)")
+    print("=" * 70)
+
+    for case in cases:
+        print(case["name"])
+        for label, planner in planners.items():
+            best, eta = float("inf"), ""
+            for _ in range(repeat):
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        result, seconds = timed(planner.compute_route, case["start"], case["goal"])
+                    best = min(best, seconds)
+                    eta = f"{result['travel_time_hours']:9.2f} h"
+                except RuntimeError as e:
+                    best, eta = float("nan"), str(e)
+                    break
+            print(f"  {label:<14}: {best:8.2f} s   {eta}")
+
+    for planner in planners.values():
+        planner.close()
+    print("=" * 70)
+
+
+# ================= ROUTE PORTFOLIO =================
+
+def bench_portfolio(cases=None):
+    # region-box canal choice vs searching every plausible option
+    import contextlib
+    import io
+    from planner import default_planner
+    from test_routes import TEST_CASES
+
+    planner = default_planner().warmup()
+    cases = cases or TEST_CASES + CANAL_CASES
+
+    print("=" * 70)
+    print("ROUTE PORTFOLIO (region boxes vs all options, lower-bound pruning)")
+    print("=" * 70)
+
+    for case in cases:
+        print(case["name"])
+        for label, portfolio in (("region boxes", False), ("portfolio", True)):
+            stats = {}
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result, seconds = timed(
+                        planner.compute_route, case["start"], case["goal"],
+                        stats=stats, portfolio=portfolio,
+                    )
+                jumps = result["canal_jumps"]
+                eta = f"{result['travel_time_hours']:9.2f} h  via {jumps[0]['canal'] if jumps else 'direct'}"
+            except RuntimeError as e:
+                seconds, eta, result = float("nan"), str(e), {}
+
+            print(f"  {label:<14}: {stats.get('expansions', 0):>9,} expansions "
+                  f"{seconds:8.2f} s   {eta}")
+            for option in result.get("route_options", []):
+                eta = option["travel_time_hours"]
+                print(f"      {option['route']:<28} bound {option['lower_bound_hours']:8.2f} h  "
+                      f"{'' if eta is None else f'{eta:.2f} h':>10}  {option['status']}")
+    print("=" * 70)
+
+
+# ================= CANAL TREES =================
+
+def bench_canal_trees(cases=None):
+    # canal routes with both legs searched vs walked up the canal trees
+    import contextlib
+    import io
+    from planner import Planner
+    from config import CANAL_TREES_FILE
+
+    cases = cases or CANAL_CASES
+    planners = {
+        "A* legs": Planner(canal_trees_file=None, leg_workers=0).warmup(),
+        "tree walks": Planner(canal_trees_file=CANAL_TREES_FILE, leg_workers=0).warmup(),
+    }
+    if planners["tree walks"].canal_trees is None:
+        print(f"[WARN] No {CANAL_TREES_FILE} - run python canal_trees.py first")
+
+    print("=" * 70)
+    print("CANAL TREES (searched legs vs precomputed shortest-path trees)")
+    print("=" * 70)
+
+    for case in cases:
+        print(case["name"])
+        for label, planner in planners.items():
+            stats = {}
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result, seconds = timed(
+                        planner.compute_route, case["start"], case["goal"], stats=stats,
+                    )
+                eta = f"{result['travel_time_hours']:9.2f} h"
+            except RuntimeError as e:
+                seconds, eta = float("nan"), str(e)
+            print(f"  {label:<12}: {stats.get('expansions', 0):>9,} expansions "
+                  f"{stats.get('tree_walks', 0)} walks {seconds:8.2f} s   {eta}")
+    print("=" * 70)
+
+
+# ================= ROUTE CACHE =================
+
+def bench_route_cache(cases=None):
+    # cold request, then memory and disk hits, on a throwaway cache file
+    import contextlib
+    import io
+    import os
+    import tempfile
+    from planner import Planner
+    from route_cache import RouteCache
+    from test_routes import TEST_CASES
+
+    cases = cases or TEST_CASES
+    path = os.path.join(tempfile.mkdtemp(), "route_cache.sqlite")
+    planner = Planner(route_cache=RouteCache(path)).warmup()
+
+    print("=" * 70)
+    print("ROUTE CACHE (miss / memory hit / disk hit after a restart)")
+    print("=" * 70)
+
+    for case in cases:
+        print(case["name"])
+        for label in ("miss", "memory", "disk"):
+            if label == "disk":
+                planner.route_cache = RouteCache(path)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result, seconds = timed(planner.compute_route, case["start"], case["goal"])
+                eta = f"{result['travel_time_hours']:9.2f} h  ({result['stats'].get('cache')})"
+            except RuntimeError as e:
+                print(f"  {label:<8}: {e}")
+                break
+            print(f"  {label:<8}: {seconds * 1000:10.2f} ms   {eta}")
+
+    print(f"Disk counters after the restart: {planner.route_cache.counters}")
+    print("=" * 70)
+
+
+# ================= ETA MATRIX =================
+
+def bench_eta_matrix(ports=None, limit=6):
+    # one multi-target Dijkstra per port vs compute_route for every pair
+    import contextlib
+    import io
+    import numpy as np
+    from planner import default_planner
+    from test_routes import TEST_CASES
+
+    if ports is None:
+        ends = [p for case in TEST_CASES + CANAL_CASES for p in (case["start"], case["goal"])]
+        ports = list(dict.fromkeys(ends))[:limit]
+    planner = default_planner().warmup()
+
+    print("=" * 70)
+    print(f"ETA MATRIX ({len(ports)} x {len(ports)} ports, {planner.leg_workers} leg workers)")
+    print("=" * 70)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        planner.edge_costs
+        etas, matrix_s = timed(planner.eta_matrix, ports, ports)
+
+    naive = np.full(etas.shape, np.nan)
+    t0 = time.perf_counter()
+    for i, start in enumerate(ports):
+        for j, goal in enumerate(ports):
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    naive[i, j] = planner.compute_route(start, goal, portfolio=True)["travel_time_hours"]
+            except RuntimeError:
+                pass
+    naive_s = time.perf_counter() - t0
+
+    both = ~np.isnan(etas) & ~np.isnan(naive)
+    print(f"  eta_matrix        : {matrix_s:8.2f} s   {np.isfinite(etas).sum()} pairs routed")
+    print(f"  compute_route loop: {naive_s:8.2f} s   {np.isfinite(naive).sum()} pairs routed")
+    if both.any():
+        # the matrix has no expansion budget: where the loop's direct search
+        # runs out it falls back to a canal option and reports a longer ETA
+        gap = etas[both] - naive[both]
+        print(f"  same ETA          : {(np.abs(gap) < 0.01).sum()} of {both.sum()} pairs, "
+              f"{(gap < -0.01).sum()} faster, {(gap > 0.01).sum()} slower in the matrix")
+    print("=" * 70)
+
+
+# ================= SPEED MODEL =================
+
+def bench_speed_model(n=200_000, seed=0):
+    # property check of the array speed model against the scalar one on
+    # random inputs (band edges and missing directions included), then
+    # throughput of both
+    import numpy as np
+    from weather import SpeedModel
+    from config import VESSEL_SPEED_KMPH
+
+    model = SpeedModel()
+    rng = np.random.default_rng(seed)
+    edges = np.array([0.0, 1.0, 2.5, 4.0, 0.2, 0.5, 0.9, 45.0, 90.0, 270.0, 315.0])
+
+    def pick(low, high):
+        values = rng.uniform(low, high, n)
+        on_edge = rng.random(n) < 0.2
+        values[on_edge] = rng.choice(edges, on_edge.sum())
+        return values
+
+    wave_h = pick(0.0, 8.0)
+    storm = np.clip(pick(-0.1, 1.1), 0.0, 1.0)
+    wave_dir = pick(0.0, 360.0)
+    heading = pick(-360.0, 720.0)
+    wave_dir[rng.random(n) < 0.1] = np.nan
+
+    print("=" * 70)
+    print(f"SPEED MODEL ({n:,} random points, array vs scalar)")
+    print("=" * 70)
+
+    for label, args in (
+        ("no heading", (wave_h, None, None, storm)),
+        ("with heading", (wave_h, wave_dir, heading, storm)),
+    ):
+        vectorized, array_s = timed(model.effective_speed_array, VESSEL_SPEED_KMPH, *args)
+
+        columns = [a.tolist() if a is not None else [None] * n for a in args]
+        columns[1] = [None if d != d else d for d in columns[1]]  # NaN -> None
+        t0 = time.perf_counter()
+        scalar = [
+            model.effective_speed(VESSEL_SPEED_KMPH, h, d, s, r)
+            for h, d, s, r in zip(*columns)
+        ]
+        scalar_s = time.perf_counter() - t0
+
+        mismatches = int(np.count_nonzero(vectorized != np.array(scalar)))
+        if mismatches:
+            raise AssertionError(f"{label}: {mismatches:,} points differ from effective_speed")
+        print(f"  {label:<13}: identical   scalar {n / scalar_s / 1e6:6.2f} M/s   "
+              f"array {n / array_s / 1e6:7.2f} M/s   ({scalar_s / array_s:.0f}x)")
+    print("=" * 70)
+
+
+# ================= EDGE COSTS =================
+
+def bench_edge_costs(edges=50_000, seed=0):
+    # the edge cost layer against the scalar search cost (leg_time at the
+    # move's bearing) on random edges, for every heading / interpolation
+    # setting; the layer is float32, so they agree to its rounding
+    import contextlib
+    import io
+    import numpy as np
+    from planner import Planner
+    from grid import DIRECTIONS
+    from edge_costs import EdgeCosts
+
+    rng = np.random.default_rng(seed)
+
+    print("=" * 70)
+    print(f"EDGE COSTS ({edges:,} random edges, layer vs scalar search cost)")
+    print("=" * 70)
+
+    for heading_aware in (False, True):
+        for interpolate in (False, True):
+            planner = Planner(
+                heading_aware=heading_aware, edge_costs_file=None, canal_trees_file=None,
+                leg_workers=0,
+            )
+            grid = planner.grid
+            planner.weather.interpolate = interpolate
+            with contextlib.redirect_stdout(io.StringIO()):
+                layer, build_s = timed(EdgeCosts.build, planner)
+            bearings = grid.build_row_bearings()
+
+            nodes = rng.choice(grid.node_ids(), edges)
+            worst = 0.0
+            checked = 0
+            for node in nodes.tolist():
+                i = node // grid.n_lon
+                for d, (di, dj) in enumerate(DIRECTIONS):
+                    if not grid.adjacency[node] >> d & 1:
+                        continue
+                    heading = bearings[i, d] if heading_aware else None
+                    want = planner.leg_time(grid.row_dist[i, d], grid.coord(node), True, heading)
+                    got = layer.costs[node, d]
+                    worst = max(worst, abs(got - want) / want)
+                    checked += 1
+
+            label = (f"heading {'on' if heading_aware else 'off'}, "
+                     f"{'bilinear' if interpolate else 'nearest'}")
+            if worst > 1e-6:
+                raise AssertionError(f"{label}: layer differs from leg_time by {worst:.2e} relative")
+            print(f"  {label:<26}: {checked:,} edges within {worst:.1e}   built in {build_s:.2f} s")
+    print("=" * 70)
+
+
+# ================= WEATHER LOOKUPS =================
+
+def bench_weather_lookup(points=20_000, seed=0):
+    # sample() against at() point for point, nearest and bilinear, on
+    # random points, exact sample points and points outside the field;
+    # then throughput of both
+    import numpy as np
+    from weather import WeatherField
+    from config import WEATHER_CACHE_FILE
+
+    rng = np.random.default_rng(seed)
+
+    print("=" * 70)
+    print(f"WEATHER LOOKUPS ({points:,} points, sample() vs at())")
+    print("=" * 70)
+
+    for interpolate in (False, True):
+        field = WeatherField(WEATHER_CACHE_FILE, interpolate=interpolate)
+        lat1 = field.lat0 + (field.n_lat - 1) * field.resolution
+        lon1 = field.lon0 + (field.n_lon - 1) * field.resolution
+        lats = rng.uniform(field.lat0 - 1, lat1 + 1, points)
+        lons = rng.uniform(field.lon0 - 1, lon1 + 1, points)
+        on_sample = rng.random(points) < 0.3
+        lats[on_sample] = field.lat0 + rng.integers(0, field.n_lat, on_sample.sum()) * field.resolution
+        lons[on_sample] = field.lon0 + rng.integers(0, field.n_lon, on_sample.sum()) * field.resolution
+
+        vectorized, sample_s = timed(field.sample, lats, lons)
+        t0 = time.perf_counter()
+        scalar = [field.at(lat, lon) for lat, lon in zip(lats.tolist(), lons.tolist())]
+        at_s = time.perf_counter() - t0
+
+        expected = np.array(
+            [(h, np.nan if d is None else d, r) for h, d, r in scalar], dtype=np.float64,
+        ).T
+        for name, actual, want in zip(vectorized._fields, vectorized, expected):
+            differ = ~((actual == want) | (np.isnan(actual) & np.isnan(want)))
+            if differ.any():
+                k = int(np.flatnonzero(differ)[0])
+                raise AssertionError(
+                    f"{'bilinear' if interpolate else 'nearest'} {name} at "
+                    f"({lats[k]}, {lons[k]}): sample {actual[k]!r} != at {want[k]!r} "
+                    f"({int(differ.sum()):,} points differ)"
+                )
+        label = "bilinear" if interpolate else "nearest"
+        print(f"  {label:<9}: identical   at() {points / at_s / 1e6:6.2f} M/s   "
+              f"sample() {points / sample_s / 1e6:7.2f} M/s   ({at_s / sample_s:.0f}x)")
+    print("=" * 70)
+
+
+# ================= WEATHER BUILD =================
+
+def bench_weather_build(storm_counts=(2, 50, 500), resolution=0.1, checks=2000, seed=0):
+    # build time of the global weather raster for growing storm lists; a
+    # random sample of cells is checked against the per-cell scalar loop
+    import math
+    import numpy as np
+    from build_weather_cache import weather_grid, storm_index, haversine, STORM_BUCKET_DEG
+
+    rng = np.random.default_rng(seed)
+    bucket_cells = max(1, round(STORM_BUCKET_DEG / resolution))
+
+    print("=" * 70)
+    print(f"WEATHER BUILD (global {resolution}° raster, {STORM_BUCKET_DEG}° storm buckets)")
+    print("=" * 70)
+
+    for count in storm_counts:
+        storms = [
+            ((float(rng.uniform(-85, 85)), float(rng.uniform(-180, 180))),
+             float(rng.uniform(100, 1500)), float(rng.uniform(0.5, 2.5)))
+            for _ in range(count)
+        ]
+        (lats, lons, wave_h, wave_dir, storm), seconds = timed(
+            weather_grid, -90, 90, -180, 180, resolution, storms,
+        )
+
+        index = storm_index(storms, lats, lons, bucket_cells)
+        tested = sum(
+            len(members) * min(bucket_cells, len(lats) - bi * bucket_cells) *
+            min(bucket_cells, len(lons) - bj * bucket_cells)
+            for (bi, bj), members in index.items()
+        )
+
+        for i, j in zip(rng.integers(0, len(lats), checks), rng.integers(0, len(lons), checks)):
+            lat, lon = float(lats[i]), float(lons[j])
+            risk = 0.0
+            for center, radius_km, intensity in storms:
+                d = haversine((lat, lon), center)
+                if d < radius_km:
+                    risk = max(risk, max(0.0, min(1.0, (1.0 - (d / radius_km) ** 2) * intensity)))
+            height = 1.5 + 1.2 * abs(math.sin(math.radians(lat)))
+            if risk > 0.1:
+                height += 5.0 * risk
+            expected = np.float32([height, (lon * 2) % 360, risk])
+            actual = np.float32([wave_h[i, j], wave_dir[i, j], storm[i, j]])
+            if not np.array_equal(expected, actual):
+                raise AssertionError(f"cell ({lat}, {lon}): {actual} != scalar {expected}")
+
+        print(f"  {count:>4} storms: {seconds:7.2f} s   {storm.size:,} cells   "
+              f"{tested / storm.size:6.2f} storm tests per cell   {checks:,} cells match")
+    print("=" * 70)
+
+
+# ================= MAIN =================
+
+BENCHMARKS = {
+    "grid": bench_grid,
+    "snap": bench_snap,
+    "startup": bench_startup,
+    "import": bench_import,
+    "search": bench_search,
+    "anyangle": bench_anyangle,
+    "coarse": bench_coarse,
+    "anytime": bench_anytime,
+    "openlist": bench_openlist,
+    "legs": bench_legs,
+    "portfolio": bench_portfolio,
+    "canal_trees": bench_canal_trees,
+    "route_cache": bench_route_cache,
+    "eta_matrix": bench_eta_matrix,
+    "speed_model": bench_speed_model,
+    "edge_costs": bench_edge_costs,
+    "weather_lookup": bench_weather_lookup,
+    "weather_build": bench_weather_build,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            sys.exit(f"Unknown benchmark '{name}'. Choose from: {', '.join(BENCHMARKS)}")
+        BENCHMARKS[name]()
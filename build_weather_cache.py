@@ -1,136 +1,191 @@
-#--------------------------
-
-#!/usr/bin/env python3
-"""
-Builds weather cache from storm_config.py settings
-Just run: python build_weather_cache.py
-"""
-
-import pickle
-import math
-from storm_config import (
-    STORM_PRESET,
-    STORM_CENTERS,
-    WEATHER_RESOLUTION,
-    WEATHER_LAT_RANGE,
-    WEATHER_LON_RANGE,
-    WEATHER_OUTPUT_FILE
-)
-
-
-def haversine(a, b):
-    """Calculate distance between two lat/lon points in km"""
-    R = 6371
-    lat1, lon1 = map(math.radians, a)
-    lat2, lon2 = map(math.radians, b)
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    h = math.sin(dlat/2)**2 + math.cos(lat1)*math.cos(lat2)*math.sin(dlon/2)**2
-    return 2 * R * math.asin(math.sqrt(h))
-
-
-def build_weather_cache():
-    """Build weather cache using configuration from storm_config.py"""
-    
-    LAT_MIN, LAT_MAX = WEATHER_LAT_RANGE
-    LON_MIN, LON_MAX = WEATHER_LON_RANGE
-    
-    print("="*70)
-    print("BUILDING WEATHER CACHE")
-    print("="*70)
-    print(f"Preset: {STORM_PRESET}")
-    print(f"Resolution: {WEATHER_RESOLUTION}°")
-    
-    if STORM_CENTERS:
-        print(f"Storm centers: {len(STORM_CENTERS)}")
-        for i, (center, radius, intensity) in enumerate(STORM_CENTERS, 1):
-            print(f"  {i}. {center} - Radius: {radius}km, Intensity: {intensity}x")
-    else:
-        print("Storm centers: NONE (Clear weather)")
-    print()
-    
-    data = {}
-    storm_points = 0
-    max_intensity = 0.0
-    
-    # Generate grid
-    lat_range = [LAT_MIN + i * WEATHER_RESOLUTION 
-                 for i in range(int((LAT_MAX - LAT_MIN) / WEATHER_RESOLUTION))]
-    lon_range = [LON_MIN + i * WEATHER_RESOLUTION 
-                 for i in range(int((LON_MAX - LON_MIN) / WEATHER_RESOLUTION))]
-    
-    total = 0
-    
-    for lat_f in lat_range:
-        for lon_f in lon_range:
-            # Base wave conditions
-            wave_h = 1.5 + 1.2 * abs(math.sin(math.radians(lat_f)))
-            wave_dir = (lon_f * 2) % 360
-            storm_risk = 0.0
-            
-            # Calculate storm influence from all centers
-            for center, radius_km, intensity in STORM_CENTERS:
-                d = haversine((lat_f, lon_f), center)
-                
-                if d < radius_km:
-                    # Quadratic falloff from center
-                    normalized_dist = d / radius_km
-                    risk = (1.0 - normalized_dist ** 2) * intensity
-                    risk = max(0.0, min(1.0, risk))
-                    
-                    # Take maximum storm risk if multiple storms overlap
-                    storm_risk = max(storm_risk, risk)
-            
-            if storm_risk > 0.1:
-                storm_points += 1
-                max_intensity = max(max_intensity, storm_risk)
-                # Add extra waves in storm areas
-                wave_h += 5.0 * storm_risk
-            
-            # Store with 0.1 degree precision for lookup
-            key = (round(lat_f, 1), round(lon_f, 1))
-            
-            # Keep maximum storm risk if key already exists
-            if key in data:
-                existing_risk = data[key]["storm_risk"]
-                if storm_risk > existing_risk:
-                    data[key] = {
-                        "wave_height": wave_h,
-                        "wave_dir": wave_dir,
-                        "storm_risk": storm_risk,
-                    }
-            else:
-                data[key] = {
-                    "wave_height": wave_h,
-                    "wave_dir": wave_dir,
-                    "storm_risk": storm_risk,
-                }
-            
-            total += 1
-    
-    # Save to file
-    with open(WEATHER_OUTPUT_FILE, "wb") as f:
-        pickle.dump(data, f)
-    
-    import os
-    file_size_kb = os.path.getsize(WEATHER_OUTPUT_FILE) / 1024
-    
-    print(f"✅ WEATHER CACHE BUILT!")
-    print(f"   File: {WEATHER_OUTPUT_FILE}")
-    print(f"   Total grid points: {len(data):,}")
-    
-    if STORM_CENTERS:
-        print(f"   Storm-affected: {storm_points:,} ({100*storm_points/total:.1f}%)")
-        print(f"   Max storm intensity: {max_intensity:.3f}")
-    else:
-        print(f"   Storm-affected: 0 (CLEAR WEATHER)")
-    
-    print(f"   File size: {file_size_kb:.1f} KB")
-    print()
-    print("="*70)
-    print("✅ Done! Now run: python main.py")
-    print("="*70)
-
-
-if __name__ == "__main__":
+#--------------------------
+
+#!/usr/bin/env python3
+"""
+Builds weather cache from storm_config.py settings
+Just run: python build_weather_cache.py
+"""
+
+import math
+import time
+import numpy as np
+from weather import save_weather_cache
+from storm_config import (
+    WEATHER_RESOLUTION,
+    WEATHER_LAT_RANGE,
+    WEATHER_LON_RANGE,
+    WEATHER_OUTPUT_FILE
+)
+
+
+# storms are bucketed in boxes of this many degrees; each box only tests
+# the storms whose radius can reach it
+STORM_BUCKET_DEG = 5.0
+KM_PER_DEG = 6371 * math.pi / 180
+
+
+def haversine(a, b):
+    """Calculate distance between two lat/lon points in km"""
+    R = 6371
+    lat1, lon1 = map(math.radians, a)
+    lat2, lon2 = map(math.radians, b)
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    h = math.sin(dlat/2)**2 + math.cos(lat1)*math.cos(lat2)*math.sin(dlon/2)**2
+    return 2 * R * math.asin(math.sqrt(h))
+
+
+def haversine_grid(lats, lons, center):
+    """haversine() from center to every (lats[:, None], lons[None, :]) point"""
+    lat1, lon1 = np.radians(lats)[:, None], np.radians(lons)[None, :]
+    lat2, lon2 = math.radians(center[0]), math.radians(center[1])
+    h = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * math.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * 6371 * np.arcsin(np.sqrt(h))
+
+
+# ================= STORM INDEX =================
+
+def storm_index(storms, lats, lons, bucket_cells):
+    """
+    {(bucket row, bucket col): [storm numbers]} over a raster of
+    bucket_cells x bucket_cells blocks: a storm is listed in every block
+    its circle may overlap (a lat/lon box around it, padded by one cell).
+    """
+    resolution = float(lats[1] - lats[0]) if len(lats) > 1 else STORM_BUCKET_DEG
+    whole_globe = float(lons[-1] - lons[0]) + resolution >= 360
+
+    index = {}
+    for k, ((lat, lon), radius_km, _) in enumerate(storms):
+        dlat = radius_km / KM_PER_DEG + resolution
+        # widest in longitude at the latitude closest to a pole
+        polar = min(abs(lat) + dlat, 90.0)
+        cos_polar = math.cos(math.radians(polar))
+        dlon = 360.0 if cos_polar < 1e-9 else radius_km / (KM_PER_DEG * cos_polar) + resolution
+
+        rows = np.flatnonzero(np.abs(lats - lat) <= dlat)
+        if dlon >= 180:
+            cols = np.arange(len(lons))
+        else:
+            offset = np.abs(lons - lon)
+            if whole_globe:
+                offset = np.minimum(offset, 360 - offset)
+            cols = np.flatnonzero(offset <= dlon)
+        if not len(rows) or not len(cols):
+            continue
+
+        for bi in np.unique(rows // bucket_cells).tolist():
+            for bj in np.unique(cols // bucket_cells).tolist():
+                index.setdefault((bi, bj), []).append(k)
+
+    return index
+
+
+def storm_risk_grid(lats, lons, storms, bucket_deg=STORM_BUCKET_DEG):
+    """
+    Storm risk at every (lat, lon) of the raster: the maximum over the
+    storms of (1 - (d / radius)^2) * intensity clipped to [0, 1], for
+    the storms closer than their radius; 0 elsewhere.
+    """
+    risks = np.zeros((len(lats), len(lons)))
+    if not storms:
+        return risks
+
+    resolution = float(lats[1] - lats[0]) if len(lats) > 1 else bucket_deg
+    bucket_cells = max(1, round(bucket_deg / resolution))
+    index = storm_index(storms, lats, lons, bucket_cells)
+
+    for (bi, bj), members in index.items():
+        rows = slice(bi * bucket_cells, (bi + 1) * bucket_cells)
+        cols = slice(bj * bucket_cells, (bj + 1) * bucket_cells)
+        block = risks[rows, cols]
+        for k in members:
+            center, radius_km, intensity = storms[k]
+            d = haversine_grid(lats[rows], lons[cols], center)
+            risk = np.clip((1.0 - (d / radius_km) ** 2) * intensity, 0.0, 1.0)
+            np.maximum(block, np.where(d < radius_km, risk, 0.0), out=block)
+
+    return risks
+
+
+def weather_grid(lat_min, lat_max, lon_min, lon_max, resolution, storms):
+    """(lats, lons, wave_heights, wave_dirs, storm_risks) for the domain"""
+    lats = lat_min + np.arange(int((lat_max - lat_min) / resolution)) * resolution
+    lons = lon_min + np.arange(int((lon_max - lon_min) / resolution)) * resolution
+
+    # base wave conditions: height by latitude, direction by longitude
+    wave_heights = np.repeat(
+        (1.5 + 1.2 * np.abs(np.sin(np.radians(lats))))[:, None], len(lons), axis=1,
+    )
+    wave_dirs = np.repeat(((lons * 2) % 360)[None, :], len(lats), axis=0)
+
+    storm_risks = storm_risk_grid(lats, lons, storms)
+    # extra waves in storm areas
+    stormy = storm_risks > 0.1
+    wave_heights[stormy] += 5.0 * storm_risks[stormy]
+
+    return lats, lons, wave_heights, wave_dirs, storm_risks
+
+
+def build_weather_cache():
+    """Build weather cache using configuration from storm_config.py"""
+    # reading the storm settings loads the CSV, so only do it here
+    from storm_config import STORM_PRESET, STORM_CENTERS
+    
+    LAT_MIN, LAT_MAX = WEATHER_LAT_RANGE
+    LON_MIN, LON_MAX = WEATHER_LON_RANGE
+    
+    print("="*70)
+    print("BUILDING WEATHER CACHE")
+    print("="*70)
+    print(f"Preset: {STORM_PRESET}")
+    print(f"Resolution: {WEATHER_RESOLUTION}°")
+    
+    if STORM_CENTERS:
+        print(f"Storm centers: {len(STORM_CENTERS)}")
+        for i, (center, radius, intensity) in enumerate(STORM_CENTERS, 1):
+            print(f"  {i}. {center} - Radius: {radius}km, Intensity: {intensity}x")
+    else:
+        print("Storm centers: NONE (Clear weather)")
+    print()
+    
+    t0 = time.perf_counter()
+    _, _, wave_heights, wave_dirs, storm_risks = weather_grid(
+        LAT_MIN, LAT_MAX, LON_MIN, LON_MAX, WEATHER_RESOLUTION, STORM_CENTERS,
+    )
+    build_s = time.perf_counter() - t0
+
+    total = storm_risks.size
+    storm_points = int(np.count_nonzero(storm_risks > 0.1))
+    max_intensity = float(storm_risks.max()) if storm_points else 0.0
+    
+    # Save to file (one array per variable, memory-mapped by WeatherField)
+    checksum = save_weather_cache(
+        WEATHER_OUTPUT_FILE, LAT_MIN, LON_MIN, WEATHER_RESOLUTION,
+        wave_heights, wave_dirs, storm_risks,
+        meta={"preset": STORM_PRESET},
+    )
+    
+    import os
+    file_size_kb = os.path.getsize(WEATHER_OUTPUT_FILE) / 1024
+    
+    print(f"✅ WEATHER CACHE BUILT!")
+    print(f"   File: {WEATHER_OUTPUT_FILE}")
+    print(f"   Checksum: {checksum[:16]}")
+    print(f"   Total grid points: {total:,} (built in {build_s:.2f}s)")
+    
+    if STORM_CENTERS:
+        print(f"   Storm-affected: {storm_points:,} ({100*storm_points/total:.1f}%)")
+        print(f"   Max storm intensity: {max_intensity:.3f}")
+    else:
+        print(f"   Storm-affected: 0 (CLEAR WEATHER)")
+    
+    print(f"   File size: {file_size_kb:.1f} KB")
+    print()
+    print("="*70)
+    print("✅ Done! Now run: python main.py")
+    print("="*70)
+
+
+if __name__ == "__main__":
     build_weather_cache()
\ No newline at end of file
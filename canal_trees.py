@@ -0,0 +1,181 @@
+# canal_trees.py
+"""
+Shortest-path trees rooted at the canal entrances.
+
+Every canal route has one leg that ends at a canal entrance and one that
+starts at the other, and there are only four entrances (CANALS in
+planner.py). For each of them this stores the tree of cheapest paths to
+it (for the leg that arrives) and from it (for the leg that leaves), over
+the planner's search cost, so those legs become a walk up the tree
+instead of an A* search.
+
+Per tree and grid cell: the direction of the next step towards the root
+as an index into grid.DIRECTIONS (NO_PARENT at the root and for
+unreachable cells) and the path cost in hours as float32.
+
+The costs depend on the weather, so the trees record the same build
+settings as the edge cost layer (edge_costs.planner_meta: grid / weather
+checksums, interpolation, vessel speed, speed model, heading); Planner
+rebuilds them when any of them changes.
+
+Build (after build_weather_cache.py):
+    python canal_trees.py
+"""
+
+import time
+import numpy as np
+from astar import dijkstra
+from grid import DIRECTIONS, snap_to_grid
+from edge_costs import planner_meta, stale_reason
+from artifacts import save_artifact, load_artifact
+from config import CANAL_TREES_FILE
+
+CANAL_TREES_ARTIFACT_KIND = "canal_trees"
+CANAL_TREES_ARTIFACT_VERSION = 1
+
+NO_PARENT = 255
+
+
+class CanalTrees:
+    """
+    roots[k] is the grid node of tree k; inbound[k] is 1 when the tree
+    holds paths *to* the root, 0 for paths from it. parents and costs
+    are (trees, cells) arrays.
+    """
+
+    def __init__(self, roots, inbound, parents, costs, meta):
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.inbound = np.asarray(inbound, dtype=np.uint8)
+        self.parents = np.asarray(parents, dtype=np.uint8)
+        self.costs = np.asarray(costs, dtype=np.float32)
+        self.meta = meta
+
+        self._parents = [memoryview(p) for p in self.parents]
+        self._to = {}
+        self._from = {}
+        for k, (root, inbound) in enumerate(zip(self.roots.tolist(), self.inbound.tolist())):
+            (self._to if inbound else self._from)[root] = k
+        self._offsets = None
+
+    def __len__(self):
+        return len(self.roots)
+
+    # ---------------- build ----------------
+
+    @classmethod
+    def build(cls, planner, canals):
+        """
+        Two Dijkstra runs per canal entrance of `canals` (the planner's
+        CANALS table), over the planner's edge cost layer.
+        """
+        grid = planner.grid
+        n_cells = grid.n_lat * grid.n_lon
+        forward = planner.edge_costs.cost
+
+        roots = []
+        for canal in canals.values():
+            for side, point in canal.items():
+                if side != "penalty_hours":
+                    roots.append(planner.snap_to_valid_node(snap_to_grid(point)))
+        roots = list(dict.fromkeys(roots))
+
+        offsets = {di * grid.n_lon + dj: d for d, (di, dj) in enumerate(DIRECTIONS)}
+        all_roots, inbound, parents, costs = [], [], [], []
+
+        for root in roots:
+            for to_root in (1, 0):
+                t0 = time.perf_counter()
+                dist, parent = dijkstra(
+                    [root], grid.neighbors, forward, n_cells, reverse=bool(to_root),
+                )
+
+                dist = np.array(dist, dtype=np.float64)
+                parent = np.array(parent, dtype=np.int64)
+                nodes = np.flatnonzero(parent >= 0)
+                steps = np.full(n_cells, NO_PARENT, dtype=np.uint8)
+                lookup = np.full(2 * grid.n_lon + 3, NO_PARENT, dtype=np.uint8)
+                for off, d in offsets.items():
+                    lookup[off + grid.n_lon + 1] = d
+                steps[nodes] = lookup[parent[nodes] - nodes + grid.n_lon + 1]
+
+                all_roots.append(root)
+                inbound.append(to_root)
+                parents.append(steps)
+                costs.append(dist.astype(np.float32))
+                print(f"[INFO] Tree {'to' if to_root else 'from'} {grid.coord(root)}: "
+                      f"{len(nodes) + 1:,} nodes in {time.perf_counter() - t0:.1f}s")
+
+        return cls(
+            all_roots, inbound, np.stack(parents), np.stack(costs), planner_meta(planner),
+        )
+
+    # ---------------- persistence ----------------
+
+    def save(self, path):
+        return save_artifact(
+            path, CANAL_TREES_ARTIFACT_KIND, CANAL_TREES_ARTIFACT_VERSION,
+            {
+                "roots": self.roots,
+                "inbound": self.inbound,
+                "parents": self.parents,
+                "costs": self.costs,
+            },
+            meta=self.meta,
+        )
+
+    @classmethod
+    def load(cls, path):
+        art = load_artifact(path, CANAL_TREES_ARTIFACT_KIND, CANAL_TREES_ARTIFACT_VERSION)
+        return cls(art["roots"], art["inbound"], art["parents"], art["costs"], art.meta)
+
+    def stale_for(self, planner):
+        # why these trees do not match the planner's search cost, or None
+        return stale_reason(self.meta, planner)
+
+    # ---------------- queries ----------------
+
+    def path(self, start, goal, n_lon):
+        """
+        Cheapest node path start -> goal when goal is the root of an
+        inbound tree or start the root of an outbound one; None when
+        neither applies or the tree does not reach the other end.
+        """
+        k = self._to.get(goal)
+        if k is not None:
+            return self._walk(k, start, n_lon)
+        k = self._from.get(start)
+        if k is not None:
+            path = self._walk(k, goal, n_lon)
+            return None if path is None else path[::-1]
+        return None
+
+    def _walk(self, k, node, n_lon):
+        if self._offsets is None or self._offsets[0] != n_lon:
+            self._offsets = (n_lon, [di * n_lon + dj for di, dj in DIRECTIONS])
+        offsets = self._offsets[1]
+        parents = self._parents[k]
+        root = int(self.roots[k])
+
+        path = [node]
+        while node != root:
+            d = parents[node]
+            if d == NO_PARENT:
+                return None
+            node += offsets[d]
+            path.append(node)
+        return path
+
+
+# ================= BUILD =================
+
+def build():
+    from planner import default_planner, CANALS
+
+    planner = default_planner()
+    trees = CanalTrees.build(planner, CANALS)
+    trees.save(CANAL_TREES_FILE)
+    print(f"[OK] Canal trees written → {CANAL_TREES_FILE} ({len(trees)} trees)")
+
+
+if __name__ == "__main__":
+    build()
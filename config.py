@@ -7,6 +7,41 @@ VESSEL_SPEED_KNOTS = 15
 VESSEL_SPEED_KMPH = VESSEL_SPEED_KNOTS * 1.852
 
 GOAL_THRESHOLD_KM = 10  # stop A* when close enough
-MAX_EXPANSIONS = 80_000
+MAX_EXPANSIONS = 80_000  # default per-search budget (max_expansions=)
+OPEN_LIST = "indexed"    # search priority queue, see openlist.OPEN_LISTS
+SMOOTHING_EPSILON_KM = 10.0  # Douglas-Peucker tolerance for route_smooth
+LEG_WORKERS = 2          # processes for canal legs and route options (0 = in-process)
+CANAL_SNAP_MAX_KM = 100.0  # route options skip a canal whose entrance snaps further away
+LOS_MAX_CELLS = 32      # longest any-angle segment (search="theta"), in grid steps
+WEATHER_INTERPOLATION = False  # bilinear weather lookups instead of nearest sample
+HEADING_AWARE = False   # directional wave penalty on each move's bearing (edge costs, ETA)
+
+# anytime search (deadline_s= / epsilon=): initial heuristic inflation and
+# how much it drops after each improved route
+ANYTIME_EPSILON = 2.5
+ANYTIME_EPSILON_STEP = 0.5
+
+# coarse-to-fine search: derived grids (coarsest first) and the corridor
+# half-width around each coarse path, in coarse cells (doubled on failure)
+COARSE_RESOLUTIONS = (2.0, 1.0)
+CORRIDOR_RADIUS = 1
+CORRIDOR_MAX_RADIUS = 8
 LOG_EVERY = 5000
+PROGRESS_POLL_S = 0.5   # how often legs on the leg pool report progress to the caller
+
+# precomputed artifacts (memory-mapped, see artifacts.py)
+GRID_FILE = "ocean_grid.bin"             # precompute_valid_nodes.py
+WEATHER_CACHE_FILE = "weather_cache.bin"  # build_weather_cache.py
+LANDMARKS_FILE = "landmarks.bin"         # landmarks.py
+CH_FILE = "contraction.bin"              # contraction.py
+CANAL_TREES_FILE = "canal_trees.bin"     # canal_trees.py (rebuilt on weather change)
+EDGE_COSTS_FILE = "edge_costs.bin"       # edge_costs.py (built on first use / weather change)
+
+# route result cache (route_cache.py): in-process LRU entries, on-disk rows
+ROUTE_CACHE_FILE = "route_cache.sqlite"
+ROUTE_CACHE_SIZE = 256
+ROUTE_CACHE_MAX_ROWS = 10_000
 
+# ALT heuristic: landmarks built offline / landmarks consulted per query
+LANDMARK_COUNT = 16
+LANDMARK_ACTIVE = 4
@@ -0,0 +1,340 @@
+# contraction.py
+"""
+Contraction hierarchy over the static ocean grid (edge length in km).
+
+Nodes are contracted one by one in order of importance; whenever the only
+shortest path between two remaining neighbours ran through the contracted
+node, a shortcut edge replaces it. A query is then a bidirectional search
+that only ever climbs to higher-ranked nodes. Shortcuts remember the node
+they bypass so the route unpacks back to grid waypoints.
+
+On a lat/lon raster the remaining graph densifies as contraction goes on,
+so nodes with more than CORE_DEGREE neighbours are left uncontracted: they
+form the core, share the top rank and keep their edges in both directions.
+Both query sides are goal-directed with the great-circle bound, which
+keeps the core part of the search narrow.
+
+Costs are static, so the planner only uses the hierarchy while the weather
+layer is uniform (see Planner.static_speed()) and falls back to astar
+otherwise.
+
+Build (after precompute_valid_nodes.py; a larger core degree shrinks the
+core and speeds up queries at the cost of a longer build):
+    python contraction.py [core_degree]
+"""
+
+import sys
+import heapq
+import numpy as np
+from geoutils import haversine
+from artifacts import save_artifact, load_artifact
+from config import GRID_FILE, CH_FILE
+
+CH_ARTIFACT_KIND = "contraction_hierarchy"
+CH_ARTIFACT_VERSION = 1
+
+# witness searches give up after this many settled nodes; a missed witness
+# only costs a redundant shortcut, never a wrong route
+WITNESS_SETTLE_LIMIT = 40
+CORE_DEGREE = 16
+
+
+class ContractionHierarchy:
+    """
+    rank[cell] is the contraction order (-1 for land, core nodes share the
+    highest rank). The upward graph is stored in CSR form: the edges of
+    node v to higher-ranked or core nodes are
+    up_targets[up_offsets[v]:up_offsets[v + 1]], with their length in km
+    and the bypassed node (-1 for an original grid edge).
+    """
+
+    def __init__(self, rank, up_offsets, up_targets, up_weights, up_middle, grid_checksum=None):
+        self.rank = np.asarray(rank, dtype=np.int32)
+        self.up_offsets = np.asarray(up_offsets, dtype=np.int64)
+        self.up_targets = np.asarray(up_targets, dtype=np.int64)
+        self.up_weights = np.asarray(up_weights, dtype=np.float64)
+        self.up_middle = np.asarray(up_middle, dtype=np.int64)
+        self.grid_checksum = grid_checksum
+
+        self._rank = memoryview(self.rank)
+        self._offsets = memoryview(self.up_offsets)
+        self._targets = memoryview(self.up_targets)
+        self._weights = memoryview(self.up_weights)
+        self._middle = memoryview(self.up_middle)
+
+    @property
+    def num_shortcuts(self):
+        return int(np.count_nonzero(self.up_middle >= 0))
+
+    @property
+    def core_size(self):
+        top = int(self.rank.max())
+        return int(np.count_nonzero(self.rank == top)) if top >= 0 else 0
+
+    # ---------------- build ----------------
+
+    @classmethod
+    def build(cls, grid, core_degree=CORE_DEGREE):
+        """
+        Greedy bottom-up contraction with lazily updated priorities (edge
+        difference + contracted neighbours).
+        """
+        adj = {}
+        for v in grid.node_ids().tolist():
+            adj[v] = {u: grid.edge_km(v, u) for u in grid.neighbors(v)}
+
+        middle = {}    # (a, b), a < b -> node bypassed by the shortcut a-b
+        deleted = dict.fromkeys(adj, 0)
+        up = {}
+        order = []
+
+        def priority(v):
+            return len(cls._shortcuts(adj, v)) - len(adj[v]) + deleted[v]
+
+        heap = [(priority(v), v) for v in adj]
+        heapq.heapify(heap)
+        total = len(heap)
+
+        while heap:
+            _, v = heapq.heappop(heap)
+            if len(adj[v]) > core_degree:
+                continue   # stays in the core
+            p = priority(v)
+            if heap and p > heap[0][0]:
+                heapq.heappush(heap, (p, v))
+                continue
+
+            for u, x, d in cls._shortcuts(adj, v):
+                if d < adj[u].get(x, float("inf")):
+                    adj[u][x] = adj[x][u] = d
+                    middle[(u, x) if u < x else (x, u)] = v
+
+            # everything still attached to v is contracted after it
+            up[v] = adj.pop(v)
+            for u in up[v]:
+                del adj[u][v]
+                deleted[u] += 1
+            order.append(v)
+
+            if len(order) % 50_000 == 0:
+                print(f"[INFO] Contracted {len(order):,}/{total:,} nodes")
+
+        core = list(adj)
+        up.update(adj)
+        print(f"[INFO] Contracted {len(order):,} nodes, {len(core):,} left in the core")
+
+        n_cells = grid.n_lat * grid.n_lon
+        rank = np.full(n_cells, -1, dtype=np.int32)
+        rank[order] = np.arange(len(order), dtype=np.int32)
+        rank[core] = len(order)
+
+        counts = np.zeros(n_cells, dtype=np.int64)
+        for v, edges in up.items():
+            counts[v] = len(edges)
+        offsets = np.zeros(n_cells + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        targets, weights, mids = [], [], []
+        for v in range(n_cells):
+            for u, w in up.get(v, {}).items():
+                targets.append(u)
+                weights.append(w)
+                mids.append(middle.get((u, v) if u < v else (v, u), -1))
+
+        return cls(rank, offsets, targets, weights, mids, grid.checksum)
+
+    @staticmethod
+    def _shortcuts(adj, v):
+        # (u, x, length) for every neighbour pair whose shortest path is u-v-x
+        edges = list(adj[v].items())
+        found = []
+
+        for k, (u, wu) in enumerate(edges[:-1]):
+            others = edges[k + 1:]
+            limit = wu + max(w for _, w in others)
+            dist = _witness(adj, u, v, limit, {x for x, _ in others})
+            for x, wx in others:
+                if dist.get(x, float("inf")) > wu + wx:
+                    found.append((u, x, wu + wx))
+
+        return found
+
+    # ---------------- persistence ----------------
+
+    def save(self, path):
+        return save_artifact(
+            path, CH_ARTIFACT_KIND, CH_ARTIFACT_VERSION,
+            {
+                "rank": self.rank,
+                "up_offsets": self.up_offsets,
+                "up_targets": self.up_targets,
+                "up_weights": self.up_weights,
+                "up_middle": self.up_middle,
+            },
+            meta={"grid_checksum": self.grid_checksum},
+        )
+
+    @classmethod
+    def load(cls, path, grid=None):
+        # grid: refuse a hierarchy contracted on another grid build
+        art = load_artifact(path, CH_ARTIFACT_KIND, CH_ARTIFACT_VERSION)
+        grid_checksum = art.meta["grid_checksum"]
+        if grid is not None and grid.checksum is not None and grid_checksum != grid.checksum:
+            raise RuntimeError(f"{path}: built for another ocean grid - rebuild it")
+        return cls(
+            art["rank"], art["up_offsets"], art["up_targets"],
+            art["up_weights"], art["up_middle"], grid_checksum,
+        )
+
+    # ---------------- query ----------------
+
+    def query(self, start, goal, coord_fn=None, stats=None):
+        """
+        Shortest (km) grid path from start to goal as a list of node ids,
+        with every shortcut unpacked. coord_fn (node -> (lat, lon)) enables
+        the great-circle bound on both sides. Raises RuntimeError when the
+        nodes are not connected.
+        """
+        if start == goal:
+            _record(stats, 0)
+            return [start]
+
+        if coord_fn is None:
+            bounds = (lambda v: 0.0, lambda v: 0.0)
+        else:
+            start_coord, goal_coord = coord_fn(start), coord_fn(goal)
+            bounds = (
+                lambda v: haversine(coord_fn(v), goal_coord),
+                lambda v: haversine(coord_fn(v), start_coord),
+            )
+
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+
+        # index 0 = upward from start, 1 = upward from goal
+        heaps = ([(bounds[0](start), start)], [(bounds[1](goal), goal)])
+        dists = ({start: 0.0}, {goal: 0.0})
+        parents = ({}, {})
+        closed = (set(), set())
+        best = float("inf")
+        meet = None
+        settled = 0
+
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                heap = heaps[side]
+                if not heap:
+                    continue
+
+                key, v = heapq.heappop(heap)
+                if key >= best:
+                    heap.clear()   # no path through this side can still improve
+                    continue
+                done = closed[side]
+                if v in done:
+                    continue
+                done.add(v)
+                settled += 1
+
+                dist, parent, bound = dists[side], parents[side], bounds[side]
+                other = dists[1 - side]
+                d = dist[v]
+                for k in range(offsets[v], offsets[v + 1]):
+                    u = targets[k]
+                    nd = d + weights[k]
+                    if nd < dist.get(u, float("inf")):
+                        dist[u] = nd
+                        parent[u] = v
+                        heapq.heappush(heap, (nd + bound(u), u))
+
+                        if u in other and nd + other[u] < best:
+                            best = nd + other[u]
+                            meet = u
+
+        _record(stats, settled)
+
+        if meet is None:
+            raise RuntimeError("No route found - search space exhausted")
+
+        # start .. meet .. goal over hierarchy edges, then unpack shortcuts
+        top = [meet]
+        while top[-1] in parents[0]:
+            top.append(parents[0][top[-1]])
+        top.reverse()
+        v = meet
+        while v in parents[1]:
+            v = parents[1][v]
+            top.append(v)
+
+        path = [start]
+        for a, b in zip(top, top[1:]):
+            self._unpack(a, b, path)
+        return path
+
+    def _unpack(self, a, b, path):
+        # append the grid nodes after a, up to and including b
+        stack = [(a, b)]
+        while stack:
+            a, b = stack.pop()
+            mid = self._bypassed(a, b)
+            if mid < 0:
+                path.append(b)
+            else:
+                stack.append((mid, b))
+                stack.append((a, mid))
+
+    def _bypassed(self, a, b):
+        # an edge is stored at its lower-ranked end (at both ends in the core)
+        if self._rank[a] > self._rank[b]:
+            a, b = b, a
+        for k in range(self._offsets[a], self._offsets[a + 1]):
+            if self._targets[k] == b:
+                return self._middle[k]
+        raise RuntimeError(f"Corrupt contraction hierarchy: no edge {a}-{b}")
+
+
+def _witness(adj, source, skip, limit, targets):
+    # bounded Dijkstra from source avoiding skip; stops once targets settle
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    remaining = set(targets)
+    settled = 0
+
+    while heap and remaining and settled < WITNESS_SETTLE_LIMIT:
+        d, x = heapq.heappop(heap)
+        if d > dist[x]:
+            continue
+        if d > limit:
+            break
+        remaining.discard(x)
+        settled += 1
+        for y, w in adj[x].items():
+            if y == skip:
+                continue
+            nd = d + w
+            if nd < dist.get(y, float("inf")):
+                dist[y] = nd
+                heapq.heappush(heap, (nd, y))
+
+    return dist
+
+
+def _record(stats, settled):
+    if stats is not None:
+        stats["expansions"] = stats.get("expansions", 0) + settled
+
+
+# ================= BUILD =================
+
+def build(core_degree=CORE_DEGREE):
+    from grid import OceanGrid
+
+    grid = OceanGrid.load(GRID_FILE)
+    print(f"[INFO] Contracting {grid.num_nodes:,} nodes")
+    ch = ContractionHierarchy.build(grid, core_degree)
+    ch.save(CH_FILE)
+    print(f"[OK] Hierarchy written → {CH_FILE} ({ch.num_shortcuts:,} shortcuts, "
+          f"{ch.core_size:,} core nodes, {len(ch.up_targets):,} upward edges)")
+
+
+if __name__ == "__main__":
+    build(*(int(a) for a in sys.argv[1:2]))
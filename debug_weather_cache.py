@@ -3,20 +3,31 @@
 Debug script to check what's actually in the weather cache
 """
 
-import pickle
+from weather import WeatherField
+from config import WEATHER_CACHE_FILE
 
-def check_weather_cache(filename="weather_cache.pkl"):
+def check_weather_cache(filename=WEATHER_CACHE_FILE):
     print("="*60)
     print(f"CHECKING: {filename}")
     print("="*60)
     
     try:
-        with open(filename, "rb") as f:
-            data = pickle.load(f)
+        field = WeatherField(filename)
     except FileNotFoundError:
         print(f"❌ File not found: {filename}")
         return
     
+    # same (lat, lon) -> values view the pickled dict cache used to give
+    data = {}
+    for i in range(field.n_lat):
+        for j in range(field.n_lon):
+            lat = round(field.lat0 + i * field.resolution, 1)
+            lon = round(field.lon0 + j * field.resolution, 1)
+            data[(lat, lon)] = {
+                "wave_height": float(field.wave_heights[i, j]),
+                "storm_risk": float(field.storm_risks[i, j]),
+            }
+    
     print(f"\n📊 Total grid points: {len(data):,}")
     
     # Check storm distribution
@@ -90,11 +101,10 @@ def check_weather_cache(filename="weather_cache.pkl"):
         (19.0, 73.0, "Mumbai")
     ]
     
-    for lat, lon, name in route_points:
-        key = (round(lat, 1), round(lon, 1))
-        if key in data:
-            storm = data[key].get("storm_risk", 0.0)
-            wave = data[key].get("wave_height", 0.0)
+    lats, lons, names = zip(*route_points)
+    sample = field.sample(lats, lons)
+    for lat, lon, name, wave, wave_dir, storm in zip(lats, lons, names, *sample):
+        if wave_dir == wave_dir:  # NaN outside the field
             print(f"   {name:20s} ({lat:.1f}, {lon:.1f}): Storm={storm:.3f}, Wave={wave:.1f}m")
         else:
             print(f"   {name:20s} ({lat:.1f}, {lon:.1f}): NOT IN CACHE")
@@ -103,4 +113,4 @@ def check_weather_cache(filename="weather_cache.pkl"):
 
 
 if __name__ == "__main__":
-    check_weather_cache("weather_cache.pkl")
\ No newline at end of file
+    check_weather_cache(WEATHER_CACHE_FILE)
\ No newline at end of file
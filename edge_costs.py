@@ -0,0 +1,127 @@
+# edge_costs.py
+"""
+Search cost of every grid edge for one weather snapshot.
+
+costs[node * 8 + d] is the search-mode travel time in hours of the move
+DIRECTIONS[d] out of node (the planner's search_cost), float32, inf
+where the grid has no such move. It is built for all cells at once from
+the grid's row distances and the planner's vectorized search_rates, so
+the searches read edge weights instead of evaluating the weather and
+speed model per relaxed edge.
+
+With a heading-aware planner each move is costed at its own bearing
+(fixed per latitude row, grid.build_row_bearings), so the directional
+wave penalty is folded into the table and the searches do no
+trigonometry.
+
+The artifact records the grid / weather checksums, weather interpolation
+mode, vessel speed, speed model and heading setting it was built for;
+Planner rebuilds it when any of them changes. Building takes about a second, so Planner also builds it on
+first use when the file does not exist.
+
+    python edge_costs.py
+"""
+
+import time
+import numpy as np
+from grid import DIRECTIONS
+from artifacts import save_artifact, load_artifact
+from config import EDGE_COSTS_FILE
+
+EDGE_COSTS_ARTIFACT_KIND = "edge_costs"
+EDGE_COSTS_ARTIFACT_VERSION = 1
+
+
+class EdgeCosts:
+    def __init__(self, costs, n_lon, meta):
+        self.costs = np.asarray(costs, dtype=np.float32).reshape(-1, len(DIRECTIONS))
+        self.meta = meta
+
+        # memoryview indexing returns plain floats
+        self._costs = memoryview(self.costs.reshape(-1))
+        self._dir = {di * n_lon + dj: d for d, (di, dj) in enumerate(DIRECTIONS)}
+
+    @classmethod
+    def build(cls, planner):
+        grid = planner.grid
+        t0 = time.perf_counter()
+
+        nodes = grid.node_ids()
+        lats, lons = grid.node_coords(nodes)
+        # the scalar path looks weather up at coord(), rounded to 6 places
+        lats, lons = np.round(lats, 6), np.round(lons, 6)
+        if planner.heading_aware:
+            headings = grid.build_row_bearings()[nodes // grid.n_lon]
+            rates = planner.search_rates(lats, lons, headings)
+        else:
+            rates = planner.search_rates(lats, lons)[:, None]
+
+        costs = np.full((grid.n_lat * grid.n_lon, len(DIRECTIONS)), np.inf, dtype=np.float32)
+        edge_km = grid.row_dist[nodes // grid.n_lon]
+        moves = (grid.adjacency[nodes, None] >> np.arange(len(DIRECTIONS), dtype=np.uint8)) & 1
+        costs[nodes] = np.where(moves == 1, edge_km * rates, np.inf)
+
+        print(f"[INFO] Edge costs for {len(nodes):,} cells in {time.perf_counter() - t0:.1f}s")
+        return cls(costs, grid.n_lon, planner_meta(planner))
+
+    def save(self, path):
+        return save_artifact(
+            path, EDGE_COSTS_ARTIFACT_KIND, EDGE_COSTS_ARTIFACT_VERSION,
+            {"costs": self.costs}, meta=self.meta,
+        )
+
+    @classmethod
+    def load(cls, path, grid):
+        art = load_artifact(path, EDGE_COSTS_ARTIFACT_KIND, EDGE_COSTS_ARTIFACT_VERSION)
+        return cls(art["costs"], grid.n_lon, art.meta)
+
+    def stale_for(self, planner):
+        # what changed since these costs were built, or None
+        return stale_reason(self.meta, planner)
+
+    def cost(self, a, b):
+        # search cost of the edge a -> b (adjacent nodes)
+        return self._costs[a * 8 + self._dir[b - a]]
+
+
+def planner_meta(planner):
+    # everything the search cost depends on, recorded in the artifacts
+    # derived from it (edge costs, canal trees)
+    return {
+        "grid_checksum": planner.grid.checksum,
+        "weather_checksum": planner.weather.checksum,
+        "weather_interpolation": planner.weather.interpolate,
+        "vessel_speed_kmph": planner.vessel_speed_kmph,
+        "speed_model": type(planner.speed_model).__name__,
+        "heading_aware": planner.heading_aware,
+    }
+
+
+def stale_reason(meta, planner):
+    # first planner_meta entry that differs from meta, as a reason, or None
+    current = planner_meta(planner)
+    for name, reason in (
+        ("grid_checksum", "built for another ocean grid"),
+        ("weather_checksum", "weather cache has changed"),
+        ("weather_interpolation", "built with another weather interpolation"),
+        ("vessel_speed_kmph", "built for another vessel speed"),
+        ("speed_model", "built for another speed model"),
+        ("heading_aware", "built with another heading setting"),
+    ):
+        if meta.get(name) != current[name]:
+            return reason
+    return None
+
+
+# ================= BUILD =================
+
+def build():
+    from planner import default_planner
+
+    costs = EdgeCosts.build(default_planner())
+    costs.save(EDGE_COSTS_FILE)
+    print(f"[OK] Edge costs written → {EDGE_COSTS_FILE}")
+
+
+if __name__ == "__main__":
+    build()
@@ -1,6 +1,6 @@
 # geo.py
 
-from math import radians, sin, cos, sqrt, atan2
+from math import radians, degrees, sin, cos, sqrt, atan2
 from config import EARTH_RADIUS_KM
 
 def haversine(a, b):
@@ -12,3 +12,13 @@ def haversine(a, b):
 
     h = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
     return 2 * EARTH_RADIUS_KM * atan2(sqrt(h), sqrt(1 - h))
+
+def initial_bearing(a, b):
+    # compass bearing in degrees [0, 360) of the great circle a -> b at a
+    lat1, lon1 = map(radians, a)
+    lat2, lon2 = map(radians, b)
+
+    dlon = lon2 - lon1
+    x = sin(dlon) * cos(lat2)
+    y = cos(lat1) * sin(lat2) - sin(lat1) * cos(lat2) * cos(dlon)
+    return degrees(atan2(x, y)) % 360
@@ -1,6 +1,12 @@
 # grid.py
 
-from config import GRID_RESOLUTION
+import numpy as np
+from config import GRID_RESOLUTION, LOS_MAX_CELLS
+from geoutils import haversine, initial_bearing
+from artifacts import save_artifact, load_artifact
+
+GRID_ARTIFACT_KIND = "ocean_grid"
+GRID_ARTIFACT_VERSION = 2  # v2: component labels
 
 def snap_to_grid(coord):
     lat, lon = coord
@@ -24,3 +30,441 @@ def get_neighbors(node):
             )
             neighbors.append(n)
     return neighbors
+
+
+# ================= OCEAN GRID =================
+
+# (dlat_idx, dlon_idx) of the 8 moves, in a fixed order
+DIRECTIONS = (
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1),           (0, 1),
+    (1, -1),  (1, 0),  (1, 1),
+)
+
+
+class OceanGrid:
+    """
+    Navigable cells as a raster indexed by (lat_idx, lon_idx).
+
+    A node is the flat integer id lat_idx * n_lon + lon_idx; coordinates
+    are only materialised through coord() at the API boundary.
+
+    adjacency holds one byte per cell with bit d set when the move
+    DIRECTIONS[d] leads to another navigable cell. row_dist[i, d] is the
+    length in km of that move from latitude row i; on a regular lat/lon
+    grid it does not depend on the longitude.
+
+    components labels connected water bodies: 0 for land, 1.. ordered by
+    decreasing size, so two nodes are mutually reachable iff their labels
+    match.
+    """
+
+    def __init__(
+        self, lat0, lon0, resolution, mask,
+        adjacency=None, row_dist=None, components=None,
+    ):
+        self.lat0 = float(lat0)
+        self.lon0 = float(lon0)
+        self.resolution = float(resolution)
+
+        self.mask = np.ascontiguousarray(mask, dtype=np.uint8)
+        self.n_lat, self.n_lon = self.mask.shape
+        self.num_nodes = int(np.count_nonzero(self.mask))
+
+        if adjacency is None:
+            adjacency = self.build_adjacency()
+        if row_dist is None:
+            row_dist = self.build_row_distances()
+        self.adjacency = np.ascontiguousarray(adjacency, dtype=np.uint8).reshape(-1)
+        self.row_dist = np.ascontiguousarray(row_dist, dtype=np.float64)
+        self.checksum = None  # set when loaded from an artifact
+
+        # memoryview indexing returns plain ints, much cheaper than numpy scalars
+        self._cells = memoryview(self.mask.reshape(-1))
+        self._adj = memoryview(self.adjacency)
+        self._row_dist = self.row_dist.reshape(-1).tolist()
+
+        offsets = tuple(di * self.n_lon + dj for di, dj in DIRECTIONS)
+        self._dir_by_offset = {off: d for d, off in enumerate(offsets)}
+        self._moves = [
+            tuple(off for d, off in enumerate(offsets) if bits >> d & 1)
+            for bits in range(256)
+        ]
+
+        if components is None:
+            components = self.label_components()
+        self.components = np.ascontiguousarray(components, dtype=np.int32).reshape(-1)
+        self.component_sizes = np.bincount(self.components)
+        self.component_sizes[0] = 0
+        self._components = memoryview(self.components)
+
+    @classmethod
+    def from_nodes(cls, nodes, resolution=GRID_RESOLUTION):
+        nodes = list(nodes)
+        lats = np.fromiter((n[0] for n in nodes), dtype=np.float64, count=len(nodes))
+        lons = np.fromiter((n[1] for n in nodes), dtype=np.float64, count=len(nodes))
+
+        lat0 = float(lats.min())
+        lon0 = float(lons.min())
+        i = np.rint((lats - lat0) / resolution).astype(np.int64)
+        j = np.rint((lons - lon0) / resolution).astype(np.int64)
+
+        mask = np.zeros((i.max() + 1, j.max() + 1), dtype=np.uint8)
+        mask[i, j] = 1
+        return cls(lat0, lon0, resolution, mask)
+
+    # ---------------- persistence ----------------
+
+    def save(self, path, meta=None):
+        return save_artifact(
+            path, GRID_ARTIFACT_KIND, GRID_ARTIFACT_VERSION,
+            {
+                "mask": self.mask,
+                "adjacency": self.adjacency.reshape(self.n_lat, self.n_lon),
+                "row_dist": self.row_dist,
+                "components": self.components.reshape(self.n_lat, self.n_lon),
+            },
+            meta={
+                "lat0": self.lat0,
+                "lon0": self.lon0,
+                "resolution": self.resolution,
+                **(meta or {}),
+            },
+        )
+
+    @classmethod
+    def load(cls, path, verify=False):
+        art = load_artifact(path, GRID_ARTIFACT_KIND, GRID_ARTIFACT_VERSION, verify)
+        grid = cls(
+            art.meta["lat0"], art.meta["lon0"], art.meta["resolution"],
+            art["mask"], adjacency=art["adjacency"], row_dist=art["row_dist"],
+            components=art["components"],
+        )
+        grid.checksum = art.checksum
+        return grid
+
+    # ---------------- id <-> coordinate ----------------
+
+    def index(self, lat, lon):
+        return (
+            round((lat - self.lat0) / self.resolution),
+            round((lon - self.lon0) / self.resolution),
+        )
+
+    def node_id(self, lat, lon):
+        i, j = self.index(lat, lon)
+        if not (0 <= i < self.n_lat and 0 <= j < self.n_lon):
+            return None
+        return i * self.n_lon + j
+
+    def coord(self, node):
+        i, j = divmod(node, self.n_lon)
+        return (
+            round(self.lat0 + i * self.resolution, 6),
+            round(self.lon0 + j * self.resolution, 6),
+        )
+
+    def is_valid(self, node):
+        return 0 <= node < len(self._cells) and self._cells[node] == 1
+
+    def node_ids(self):
+        return np.flatnonzero(self.mask.reshape(-1))
+
+    def node_coords(self, nodes):
+        i, j = np.divmod(np.asarray(nodes, dtype=np.int64), self.n_lon)
+        return (
+            self.lat0 + i * self.resolution,
+            self.lon0 + j * self.resolution,
+        )
+
+    # ---------------- adjacency ----------------
+
+    def neighbors(self, node):
+        return [node + off for off in self._moves[self._adj[node]]]
+
+    def edge_km(self, a, b):
+        # a and b must be adjacent; table read instead of haversine
+        d = self._dir_by_offset[b - a]
+        return self._row_dist[(a // self.n_lon) * 8 + d]
+
+    def line_cells(self, a, b):
+        """
+        Cells a straight a-b segment (between cell centres, in index space)
+        starts a piece in: a first, then every cell it crosses, b excluded.
+        None when one of them is land or the segment spans more than
+        LOS_MAX_CELLS steps. Passing exactly through a corner steps
+        diagonally, like the 8-connected moves do.
+        """
+        i, j = divmod(a, self.n_lon)
+        i1, j1 = divmod(b, self.n_lon)
+        ni, nj = abs(i1 - i), abs(j1 - j)
+        if max(ni, nj) > LOS_MAX_CELLS:
+            return None
+
+        si = 1 if i1 > i else -1
+        sj = 1 if j1 > j else -1
+        cells = [a]
+        cells_mask = self._cells
+        n_lon = self.n_lon
+        ki = kj = 0
+
+        while ki < ni or kj < nj:
+            # which boundary comes first: (ki + 1/2) / ni vs (kj + 1/2) / nj
+            decide = (1 + 2 * ki) * nj - (1 + 2 * kj) * ni
+            if decide == 0:
+                i += si
+                j += sj
+                ki += 1
+                kj += 1
+            elif decide < 0:
+                i += si
+                ki += 1
+            else:
+                j += sj
+                kj += 1
+
+            node = i * n_lon + j
+            if not cells_mask[node]:
+                return None
+            cells.append(node)
+
+        cells.pop()  # b
+        return cells
+
+    def build_adjacency(self):
+        mask = self.mask.astype(bool)
+        adjacency = np.zeros(mask.shape, dtype=np.uint8)
+
+        for d, (di, dj) in enumerate(DIRECTIONS):
+            # target[i, j] = mask[i + di, j + dj], False outside the raster
+            target = np.zeros_like(mask)
+            target[
+                max(-di, 0):self.n_lat - max(di, 0),
+                max(-dj, 0):self.n_lon - max(dj, 0),
+            ] = mask[
+                max(di, 0):self.n_lat + min(di, 0),
+                max(dj, 0):self.n_lon + min(dj, 0),
+            ]
+            adjacency |= ((mask & target).astype(np.uint8) << d)
+
+        return adjacency
+
+    def build_row_distances(self):
+        row_dist = np.zeros((self.n_lat, len(DIRECTIONS)), dtype=np.float64)
+
+        for i in range(self.n_lat):
+            a = (self.lat0 + i * self.resolution, 0.0)
+            for d, (di, dj) in enumerate(DIRECTIONS):
+                b = (a[0] + di * self.resolution, dj * self.resolution)
+                row_dist[i, d] = haversine(a, b)
+
+        return row_dist
+
+    def build_row_bearings(self):
+        # bearing in degrees of each move from latitude row i, like row_dist
+        # independent of the longitude; derived on demand, not stored
+        bearings = np.zeros((self.n_lat, len(DIRECTIONS)), dtype=np.float64)
+
+        for i in range(self.n_lat):
+            a = (self.lat0 + i * self.resolution, 0.0)
+            for d, (di, dj) in enumerate(DIRECTIONS):
+                b = (a[0] + di * self.resolution, dj * self.resolution)
+                bearings[i, d] = initial_bearing(a, b)
+
+        return bearings
+
+    # ---------------- multi-resolution ----------------
+
+    def coarsen(self, factor):
+        """
+        Grid of factor x factor blocks of this one. A block is navigable
+        when its water cells form a single connected piece inside the
+        block, and two blocks are adjacent when a fine edge crosses from
+        one to the other, so coarse paths never jump an isthmus that cuts
+        a block in two. block(node, factor) maps fine nodes onto it.
+        """
+        n_lat = -(-self.n_lat // factor)
+        n_lon = -(-self.n_lon // factor)
+        adjacency = self.adjacency.reshape(self.n_lat, self.n_lon)
+
+        bi = np.arange(self.n_lat) // factor
+        bj = np.arange(self.n_lon) // factor
+
+        # min-label propagation along fine edges that stay inside a block
+        cells = np.arange(self.n_lat * self.n_lon, dtype=np.int64).reshape(self.n_lat, self.n_lon)
+        big = np.iinfo(np.int64).max
+        labels = np.where(self.mask.astype(bool), cells, big)
+
+        changed = True
+        while changed:
+            changed = False
+            for d, (di, dj) in enumerate(DIRECTIONS):
+                src, dst = _shifted(self.n_lat, self.n_lon, di, dj)
+                inside = (
+                    (adjacency[src] >> d & 1).astype(bool) &
+                    (bi[src[0]] == bi[dst[0]])[:, None] &
+                    (bj[src[1]] == bj[dst[1]])[None, :]
+                )
+                lower = np.where(inside, labels[dst], big)
+                update = lower < labels[src]
+                if update.any():
+                    labels[src] = np.where(update, lower, labels[src])
+                    changed = True
+
+        # one root (label == own id) per connected piece
+        ri, rj = np.nonzero(labels == cells)
+        pieces = np.zeros((n_lat, n_lon), dtype=np.int64)
+        np.add.at(pieces, (bi[ri], bj[rj]), 1)
+        mask = (pieces == 1).astype(np.uint8)
+
+        # coarse adjacency from fine edges crossing between navigable blocks
+        coarse_adj = np.zeros(n_lat * n_lon, dtype=np.uint8)
+        bit_of = np.zeros(9, dtype=np.uint8)
+        for d, (di, dj) in enumerate(DIRECTIONS):
+            bit_of[(di + 1) * 3 + dj + 1] = 1 << d
+
+        for d, (di, dj) in enumerate(DIRECTIONS):
+            src, _ = _shifted(self.n_lat, self.n_lon, di, dj)
+            fi, fj = np.nonzero(adjacency[src] >> d & 1)
+            fi += src[0].start
+            fj += src[1].start
+            ai, aj = bi[fi], bj[fj]
+            ci, cj = bi[fi + di], bj[fj + dj]
+            keep = ((ai != ci) | (aj != cj)) & (mask[ai, aj] == 1) & (mask[ci, cj] == 1)
+            np.bitwise_or.at(
+                coarse_adj,
+                ai[keep] * n_lon + aj[keep],
+                bit_of[(ci - ai + 1) * 3 + (cj - aj + 1)][keep],
+            )
+
+        # block centres as coordinates
+        offset = (factor - 1) / 2 * self.resolution
+        return OceanGrid(
+            self.lat0 + offset, self.lon0 + offset, self.resolution * factor,
+            mask, adjacency=coarse_adj.reshape(n_lat, n_lon),
+        )
+
+    def block(self, node, factor):
+        # node id of the block containing node in self.coarsen(factor)
+        i, j = divmod(node, self.n_lon)
+        return (i // factor) * -(-self.n_lon // factor) + j // factor
+
+    # ---------------- water bodies ----------------
+
+    def component(self, node):
+        return self._components[node]
+
+    def connected(self, a, b):
+        return self._components[a] != 0 and self._components[a] == self._components[b]
+
+    def label_components(self):
+        # one-off flood fill over the adjacency (grid build time, not search time)
+        labels = [0] * (self.n_lat * self.n_lon)
+        neighbors = self.neighbors
+        count = 0
+
+        for start in self.node_ids().tolist():
+            if labels[start]:
+                continue
+            count += 1
+            labels[start] = count
+            stack = [start]
+            while stack:
+                for n in neighbors(stack.pop()):
+                    if not labels[n]:
+                        labels[n] = count
+                        stack.append(n)
+
+        labels = np.array(labels, dtype=np.int32)
+        sizes = np.bincount(labels, minlength=count + 1)
+        sizes[0] = 0
+
+        # relabel so 1 is the largest water body
+        order = np.argsort(-sizes[1:], kind="stable") + 1
+        remap = np.zeros(count + 1, dtype=np.int32)
+        remap[order] = np.arange(1, count + 1, dtype=np.int32)
+        return remap[labels].reshape(self.n_lat, self.n_lon)
+
+    # ---------------- snapping ----------------
+
+    def nearest_node(self, lat, lon, component=None):
+        """
+        Closest navigable node to (lat, lon) by squared-degree distance,
+        found by growing a window outward over the raster. With component
+        set, only nodes of that water body qualify. None if there is no
+        such node at all.
+        """
+        fi = (lat - self.lat0) / self.resolution
+        fj = (lon - self.lon0) / self.resolution
+        ci = min(max(round(fi), 0), self.n_lat - 1)
+        cj = min(max(round(fj), 0), self.n_lon - 1)
+
+        # the cell containing the point is the nearest cell of all
+        node = ci * self.n_lon + cj
+        if self._cells[node] if component is None else self._components[node] == component:
+            return node
+
+        r = 1
+        max_r = max(self.n_lat, self.n_lon)
+        while not self._window(ci, cj, r, component)[0].any():
+            if r >= max_r:
+                return None
+            r *= 2
+
+        # a hit within Chebyshev radius r bounds the true nearest node
+        off = ((fi - ci) ** 2 + (fj - cj) ** 2) ** 0.5
+        window, i0, j0 = self._window(ci, cj, int(2 ** 0.5 * r + 2 * off) + 1, component)
+
+        ii, jj = np.nonzero(window)
+        d2 = (ii + i0 - fi) ** 2 + (jj + j0 - fj) ** 2
+        k = int(np.argmin(d2))
+        return int((ii[k] + i0) * self.n_lon + jj[k] + j0)
+
+    def nearest_nodes(self, lats, lons):
+        """
+        Batch nearest_node(). Points whose own cell is navigable are
+        resolved with array indexing, only the rest (deduplicated) fall
+        back to the window search. Returns an int64 array (-1 where
+        nothing found).
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        fi = (lats - self.lat0) / self.resolution
+        fj = (lons - self.lon0) / self.resolution
+        ci = np.clip(np.rint(fi), 0, self.n_lat - 1).astype(np.int64)
+        cj = np.clip(np.rint(fj), 0, self.n_lon - 1).astype(np.int64)
+
+        nodes = ci * self.n_lon + cj
+        hit = self.mask[ci, cj].astype(bool)
+
+        misses = np.flatnonzero(~hit)
+        if len(misses):
+            points, inverse = np.unique(
+                np.column_stack((lats[misses], lons[misses])),
+                axis=0, return_inverse=True,
+            )
+            found = np.full(len(points), -1, dtype=np.int64)
+            for k, (lat, lon) in enumerate(points):
+                node = self.nearest_node(float(lat), float(lon))
+                if node is not None:
+                    found[k] = node
+            nodes[misses] = found[inverse.reshape(-1)]
+
+        return nodes
+
+    def _window(self, ci, cj, r, component=None):
+        i0 = max(ci - r, 0)
+        j0 = max(cj - r, 0)
+        if component is None:
+            return self.mask[i0:ci + r + 1, j0:cj + r + 1], i0, j0
+
+        labels = self.components.reshape(self.n_lat, self.n_lon)
+        return labels[i0:ci + r + 1, j0:cj + r + 1] == component, i0, j0
+
+
+def _shifted(n_lat, n_lon, di, dj):
+    # (rows, cols) slices of the cells that have a neighbour in direction
+    # (di, dj), and of those neighbours
+    src = (slice(max(-di, 0), n_lat - max(di, 0)), slice(max(-dj, 0), n_lon - max(dj, 0)))
+    dst = (slice(max(di, 0), n_lat + min(di, 0)), slice(max(dj, 0), n_lon + min(dj, 0)))
+    return src, dst
@@ -0,0 +1,83 @@
+# instrument.py
+"""
+Per-request search statistics.
+
+compute_route() returns a "stats" dict with the time spent in each phase
+(snap, every search leg, smoothing, ETA), the search counters of every
+leg (expansions, open-list pushes, cost-function calls) and the process
+peak RSS. The searches count their cost calls themselves; the time spent
+in the cost function is only measured on request (timed), since clocking
+every edge slows the search down. Everything is plain numbers so a record
+can be written as one JSON line (append_jsonl).
+
+The searches report progress only through an optional callback;
+tqdm_progress() gives the old progress bar back.
+"""
+
+import json
+import sys
+import time
+
+# counters combined with max() instead of summed when legs are merged
+PEAK_COUNTERS = ("open_peak", "suboptimality")
+
+
+def merge_stats(into, stats):
+    # fold one search's counters into a running total
+    if into is None:
+        return
+    for name, value in stats.items():
+        if name in PEAK_COUNTERS:
+            into[name] = max(into.get(name, value), value)
+        elif isinstance(value, (int, float)):
+            into[name] = into.get(name, 0) + value
+
+
+def timed(cost_fn, stats):
+    # cost_fn that adds the time spent in it to stats["cost_s"]
+    clock = time.perf_counter
+    stats.setdefault("cost_s", 0.0)
+
+    def cost(a, b):
+        t0 = clock()
+        c = cost_fn(a, b)
+        stats["cost_s"] += clock() - t0
+        return c
+
+    return cost
+
+
+def peak_rss_mb():
+    # peak resident set size (ru_maxrss) of this process so far, None where
+    # unsupported. It is the high-water mark of the whole process, not of
+    # one request: a small route after a large one reports the large one's.
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def tqdm_progress(desc="A* Search"):
+    # progress callback for the searches that drives a tqdm bar
+    from tqdm import tqdm  # ~50 ms to import, keep it off `import planner`
+
+    bar = None
+
+    def progress(expansions, total, done):
+        nonlocal bar
+        if bar is None:
+            bar = tqdm(total=total, desc=desc, unit="nodes", dynamic_ncols=True)
+        bar.update(expansions - bar.n)
+        if done:
+            bar.close()
+            bar = None
+
+    return progress
+
+
+def append_jsonl(path, record):
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
@@ -0,0 +1,211 @@
+# landmarks.py
+"""
+ALT (A*, Landmarks, Triangle inequality) heuristic.
+
+For a landmark L with static sea distances d(L, .) over the grid, the
+triangle inequality gives |d(L, t) - d(L, v)| <= d(v, t) for every node v,
+which is a far better lower bound than the great-circle distance once a
+continent sits between v and t. Divided by the vessel speed it bounds the
+search cost in hours, because the weather only ever slows the ship down.
+
+Build (after precompute_valid_nodes.py):
+    python landmarks.py [count]
+Report expansion reductions against the great-circle heuristic:
+    python landmarks.py --report [pairs]
+"""
+
+import sys
+import numpy as np
+from astar import dijkstra, heuristic
+from artifacts import save_artifact, load_artifact
+from config import GRID_FILE, LANDMARKS_FILE, LANDMARK_COUNT, LANDMARK_ACTIVE
+
+LANDMARKS_ARTIFACT_KIND = "landmarks"
+LANDMARKS_ARTIFACT_VERSION = 1
+
+# float32 tables are off by up to ~2 m at 20,000 km; stay below the true bound
+SLACK_KM = 0.01
+
+
+class Landmarks:
+    """
+    Landmark node ids and one float32 table per landmark with the sea
+    distance in km from it to every cell (inf off its water body).
+    """
+
+    def __init__(self, nodes, dist_km, grid_checksum=None):
+        self.nodes = np.asarray(nodes, dtype=np.int64)
+        self.dist_km = np.asarray(dist_km, dtype=np.float32)
+        self.grid_checksum = grid_checksum
+        self._tables = [memoryview(t) for t in self.dist_km]
+
+    def __len__(self):
+        return len(self.nodes)
+
+    # ---------------- build ----------------
+
+    @classmethod
+    def build(cls, grid, count=LANDMARK_COUNT, seed=0):
+        """
+        Farthest-point selection on the largest water body: each new
+        landmark is the node farthest (by sea distance) from all landmarks
+        chosen so far, which spreads them to the ends of the ocean where
+        their bounds are tightest.
+        """
+        nodes = grid.node_ids()
+        nodes = nodes[grid.components[nodes] == 1]
+        if not len(nodes):
+            raise RuntimeError("Grid has no navigable nodes")
+
+        rng = np.random.default_rng(seed)
+        seed_node = int(rng.choice(nodes))
+        landmark = int(nodes[np.argmax(cls.distances(grid, seed_node)[nodes])])
+
+        chosen, tables = [], []
+        nearest = np.full(grid.n_lat * grid.n_lon, np.inf)
+
+        for k in range(count):
+            dist = cls.distances(grid, landmark)
+            chosen.append(landmark)
+            tables.append(dist.astype(np.float32))
+            print(f"[INFO] Landmark {k + 1}/{count}: {grid.coord(landmark)}")
+
+            np.minimum(nearest, dist, out=nearest)
+            landmark = int(nodes[np.argmax(nearest[nodes])])
+
+        return cls(chosen, np.stack(tables), grid.checksum)
+
+    @staticmethod
+    def distances(grid, source):
+        dist, _ = dijkstra([source], grid.neighbors, grid.edge_km, grid.n_lat * grid.n_lon)
+        return np.array(dist)
+
+    # ---------------- persistence ----------------
+
+    def save(self, path):
+        return save_artifact(
+            path, LANDMARKS_ARTIFACT_KIND, LANDMARKS_ARTIFACT_VERSION,
+            {"nodes": self.nodes, "dist_km": self.dist_km},
+            meta={"grid_checksum": self.grid_checksum},
+        )
+
+    @classmethod
+    def load(cls, path, grid=None):
+        # grid: refuse tables computed on another grid build
+        art = load_artifact(path, LANDMARKS_ARTIFACT_KIND, LANDMARKS_ARTIFACT_VERSION)
+        grid_checksum = art.meta["grid_checksum"]
+        if grid is not None and grid.checksum is not None and grid_checksum != grid.checksum:
+            raise RuntimeError(f"{path}: built for another ocean grid - rebuild it")
+        return cls(art["nodes"], art["dist_km"], grid_checksum)
+
+    # ---------------- heuristic ----------------
+
+    def heuristic_fn(self, start, goal, max_speed_kmph, coord_fn=None, active=LANDMARK_ACTIVE):
+        """
+        heuristic_fn(node, target) for astar()/bidirectional_astar(): the
+        larger of the great-circle bound and the ALT bound over the
+        `active` landmarks that best separate start and goal.
+        """
+        # only landmarks on the query's water body bound anything; the
+        # others are inf from both ends
+        to_start = self.dist_km[:, start].astype(np.float64)
+        to_goal = self.dist_km[:, goal].astype(np.float64)
+        usable = np.flatnonzero(np.isfinite(to_start) & np.isfinite(to_goal))
+        scores = np.abs(to_start[usable] - to_goal[usable])
+        chosen = usable[np.argsort(-scores, kind="stable")[:active]]
+        tables = [self._tables[k] for k in chosen.tolist()]
+
+        targets = {}
+
+        def h(node, target):
+            best = 0.0
+            for t in tables:
+                d = t[node] - t[target]
+                if d < 0:
+                    d = -d
+                if d > best:
+                    best = d
+            alt = (best - SLACK_KM) / max_speed_kmph
+
+            if coord_fn is None:
+                return alt
+            target_coord = targets.get(target)
+            if target_coord is None:
+                target_coord = targets[target] = coord_fn(target)
+            gc = heuristic(coord_fn(node), target_coord, max_speed_kmph)
+            return alt if alt > gc else gc
+
+        return h
+
+
+# ================= TOOL =================
+
+def build(count=LANDMARK_COUNT):
+    from grid import OceanGrid
+
+    grid = OceanGrid.load(GRID_FILE)
+    print(f"[INFO] Selecting {count} landmarks on {grid.num_nodes:,} nodes")
+    landmarks = Landmarks.build(grid, count)
+    landmarks.save(LANDMARKS_FILE)
+    print(f"[OK] Landmarks written → {LANDMARKS_FILE} "
+          f"({landmarks.dist_km.nbytes / 1e6:.1f} MB)")
+
+
+def report(pairs=20, seed=1):
+    # same random queries with and without landmarks: expansions and cost
+    import contextlib
+    import io
+    import time
+    import random
+    from planner import Planner
+
+    plain = Planner(landmarks_file=None).warmup()
+    alt = Planner().warmup()
+    if alt.landmarks is None:
+        sys.exit(f"No usable {LANDMARKS_FILE} - run: python landmarks.py")
+
+    grid = alt.grid
+    nodes = grid.node_ids()
+    nodes = nodes[grid.components[nodes] == 1].tolist()
+    rng = random.Random(seed)
+
+    print("=" * 70)
+    print(f"ALT LANDMARKS ({len(alt.landmarks)} built, {LANDMARK_ACTIVE} active per query)")
+    print("=" * 70)
+
+    totals = [0, 0]
+    for _ in range(pairs):
+        start, goal = rng.choice(nodes), rng.choice(nodes)
+        row = []
+        for planner in (plain, alt):
+            stats = {}
+            t0 = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()), \
+                     contextlib.redirect_stderr(io.StringIO()):
+                    path = planner.find_path(start, goal, stats=stats)
+                hours = sum(planner.search_cost(a, b) for a, b in zip(path, path[1:]))
+                cost = f"{hours:8.1f} h"
+            except RuntimeError:
+                cost = "   limit  "
+            row.append((stats.get("expansions", 0), time.perf_counter() - t0, cost))
+
+        (n_gc, t_gc, c_gc), (n_alt, t_alt, c_alt) = row
+        totals[0] += n_gc
+        totals[1] += n_alt
+        print(f"{grid.coord(start)} → {grid.coord(goal)}")
+        print(f"  great-circle: {n_gc:>9,} expansions {t_gc:7.2f} s {c_gc}")
+        print(f"  ALT         : {n_alt:>9,} expansions {t_alt:7.2f} s {c_alt}")
+
+    print("-" * 70)
+    print(f"Total expansions: {totals[0]:,} → {totals[1]:,} "
+          f"({totals[0] / max(totals[1], 1):.1f}x fewer)")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "--report":
+        report(*(int(a) for a in args[1:2]))
+    else:
+        build(*(int(a) for a in args[:1]))
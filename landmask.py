@@ -1,13 +1,16 @@
 from functools import lru_cache
-import geopandas as gpd
-from shapely.geometry import Point
 
 class LandMask:
     def __init__(self, shapefile_path):
+        # geopandas is slow to import and only needed when building the grid
+        import geopandas as gpd
+        from shapely.geometry import Point
+
         self.land = gpd.read_file(shapefile_path).to_crs(epsg=4326)
         self.land_union = self.land.unary_union
+        self._point = Point
 
     @lru_cache(maxsize=500_000)
     def is_ocean(self, lat, lon):
-        point = Point(lon, lat)
+        point = self._point(lon, lat)
         return not self.land_union.contains(point)
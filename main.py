@@ -1,7 +1,9 @@
 # main.py
 
 import json
-from planner import compute_route
+from planner import Planner
+from route_cache import RouteCache
+from config import ROUTE_CACHE_FILE
 from visualize_route import visualize_route
 
 
@@ -33,7 +35,8 @@ if __name__ == "__main__":
     print("[INFO] Goal :", goal)
 
     # ----------- COMPUTE ROUTE -----------
-    result = compute_route(start, goal, smooth=True)
+    planner = Planner(route_cache=RouteCache(ROUTE_CACHE_FILE))
+    result = planner.compute_route(start, goal, smooth=True, progress=True)
 
     # ----------- SAVE TO route.json -----------
     output = {
@@ -54,6 +57,9 @@ if __name__ == "__main__":
         "max_storm_risk": result["max_storm_risk"],
         "avg_storm_risk": result["avg_storm_risk"],
         "high_risk_waypoints": result["high_risk_waypoints"],
+
+        # timings and search counters
+        "stats": result["stats"],
     }
 
     with open("route.json", "w") as f:
@@ -66,6 +72,7 @@ if __name__ == "__main__":
     print("Raw waypoints     :", result["num_waypoints_raw"])
     print("Smoothed waypoints:", result["num_waypoints_smooth"])
     print("Travel time (hrs) :", result["travel_time_hours"])
+    print("Planning time (s) :", result["stats"]["total_s"])
     print("Canal jumps       :", len(result.get("canal_jumps", [])))
 
     if result.get("canal_jumps"):
@@ -0,0 +1,170 @@
+# openlist.py
+"""
+Open lists (priority queues) for the searches in astar.py.
+
+Both keep one live entry per node: push(node, key) inserts the node or
+moves it to a lower key, pop() returns the (key, node) with the smallest
+key, ties broken by node id, so every implementation pops in the same
+order and searches return the same path whichever one is used.
+
+    HeapOpenList     heapq with lazy deletion: an improvement pushes a new
+                     entry and the old one is dropped when it surfaces
+                     (cheap C pushes, heap grows with every improvement)
+    IndexedOpenList  binary heap with a node -> slot index and in-place
+                     decrease-key (one entry per node, sifts in Python)
+
+Each list counts its work in .counters; record(stats) folds them into a
+search stats dict as open_pushes, open_decrease_keys, open_stale_pops and
+open_peak (largest heap size, including stale entries).
+"""
+
+import heapq
+
+
+class HeapOpenList:
+    def __init__(self):
+        self._heap = []
+        self._live = {}    # node -> key of its current entry
+        self.counters = {"pushes": 0, "decrease_keys": 0, "stale_pops": 0, "peak": 0}
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, node):
+        return node in self._live
+
+    def __iter__(self):
+        return iter(self._live)
+
+    def push(self, node, key):
+        c = self.counters
+        if node in self._live:
+            c["decrease_keys"] += 1
+        self._live[node] = key
+        heapq.heappush(self._heap, (key, node))
+        c["pushes"] += 1
+        if len(self._heap) > c["peak"]:
+            c["peak"] = len(self._heap)
+
+    def pop(self):
+        heap, live = self._heap, self._live
+        while True:
+            key, node = heapq.heappop(heap)
+            if live.get(node) == key:
+                del live[node]
+                return key, node
+            self.counters["stale_pops"] += 1
+
+    def peek_key(self):
+        heap, live = self._heap, self._live
+        while live.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+            self.counters["stale_pops"] += 1
+        return heap[0][0]
+
+    def record(self, stats):
+        _record(stats, self.counters)
+
+
+class IndexedOpenList:
+    def __init__(self):
+        self._heap = []    # (key, node)
+        self._slot = {}    # node -> index in _heap
+        self.counters = {"pushes": 0, "decrease_keys": 0, "stale_pops": 0, "peak": 0}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, node):
+        return node in self._slot
+
+    def __iter__(self):
+        return iter(self._slot)
+
+    def push(self, node, key):
+        c = self.counters
+        i = self._slot.get(node)
+        if i is None:
+            i = len(self._heap)
+            self._heap.append((key, node))
+            c["pushes"] += 1
+            if i + 1 > c["peak"]:
+                c["peak"] = i + 1
+        else:
+            c["decrease_keys"] += 1
+            old = self._heap[i]
+            self._heap[i] = (key, node)
+            if (key, node) > old:
+                self._sift_down(i)
+                return
+        self._sift_up(i)
+
+    def pop(self):
+        heap, slot = self._heap, self._slot
+        top = heap[0]
+        last = heap.pop()
+        del slot[top[1]]
+        if heap:
+            heap[0] = last
+            slot[last[1]] = 0
+            self._sift_down(0)
+        return top
+
+    def peek_key(self):
+        return self._heap[0][0]
+
+    def record(self, stats):
+        _record(stats, self.counters)
+
+    def _sift_up(self, i):
+        heap, slot = self._heap, self._slot
+        item = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            above = heap[parent]
+            if not item < above:
+                break
+            heap[i] = above
+            slot[above[1]] = i
+            i = parent
+        heap[i] = item
+        slot[item[1]] = i
+
+    def _sift_down(self, i):
+        heap, slot = self._heap, self._slot
+        n = len(heap)
+        item = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and heap[child + 1] < heap[child]:
+                child += 1
+            below = heap[child]
+            if not below < item:
+                break
+            heap[i] = below
+            slot[below[1]] = i
+            i = child
+        heap[i] = item
+        slot[item[1]] = i
+
+
+OPEN_LISTS = {
+    "heap": HeapOpenList,
+    "indexed": IndexedOpenList,
+}
+
+
+def make_open_list(kind):
+    try:
+        return OPEN_LISTS[kind]()
+    except KeyError:
+        raise ValueError(f"Unknown open list '{kind}'. Choose from: {', '.join(OPEN_LISTS)}")
+
+
+def _record(stats, counters):
+    if stats is not None:
+        for name in ("pushes", "decrease_keys", "stale_pops"):
+            stats[f"open_{name}"] = stats.get(f"open_{name}", 0) + counters[name]
+        stats["open_peak"] = max(stats.get("open_peak", 0), counters["peak"])
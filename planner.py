@@ -1,24 +1,40 @@
 # planner.py
 
-import pickle
-from grid import snap_to_grid, get_neighbors
-from astar import astar
+import os
+import time
+import itertools
+import numpy as np
+from grid import snap_to_grid, OceanGrid
+from astar import astar, bidirectional_astar, theta_star, ara_star, dijkstra
 from smoothing import douglas_peucker
-from geoutils import haversine
-from config import VESSEL_SPEED_KMPH
+from geoutils import haversine, initial_bearing
+from config import (
+    VESSEL_SPEED_KMPH,
+    GRID_RESOLUTION,
+    MAX_EXPANSIONS,
+    OPEN_LIST,
+    LEG_WORKERS,
+    CANAL_SNAP_MAX_KM,
+    PROGRESS_POLL_S,
+    SMOOTHING_EPSILON_KM,
+    ANYTIME_EPSILON,
+    GRID_FILE,
+    WEATHER_CACHE_FILE,
+    LANDMARKS_FILE,
+    CH_FILE,
+    CANAL_TREES_FILE,
+    EDGE_COSTS_FILE,
+    HEADING_AWARE,
+    COARSE_RESOLUTIONS,
+    CORRIDOR_RADIUS,
+    CORRIDOR_MAX_RADIUS,
+)
 from weather import WeatherField, SpeedModel
-
-
-# ================= LOAD PRECOMPUTED GRID =================
-
-with open("valid_nodes_world.pkl", "rb") as f:
-    VALID_NODES_LIST = pickle.load(f)
-
-VALID_NODES = set(VALID_NODES_LIST)
-print(f"[INFO] Loaded {len(VALID_NODES):,} valid nodes")
-
-weather = WeatherField("weather_cache.pkl")
-speed_model = SpeedModel()
+from landmarks import Landmarks
+from contraction import ContractionHierarchy
+from canal_trees import CanalTrees
+from edge_costs import EdgeCosts
+from instrument import merge_stats, timed, peak_rss_mb, tqdm_progress, append_jsonl
 
 
 # ================= CANAL REGISTRY =================
@@ -77,164 +93,1306 @@ def is_europe_mediterranean(coord):
     )
 
 
-# ================= HELPERS =================
+def corridor_mask(grid, path, radius, ratio, shape):
+    # cells of a grid `ratio` times finer than grid within `radius` coarse
+    # cells (Chebyshev) of path, cropped to shape
+    mask = np.zeros(grid.n_lat * grid.n_lon, dtype=bool)
+    mask[path] = True
+    mask = mask.reshape(grid.n_lat, grid.n_lon)
 
-def snap_to_valid_node(point):
-    lat, lon = point
-    return min(
-        VALID_NODES,
-        key=lambda v: (v[0] - lat) ** 2 + (v[1] - lon) ** 2
-    )
+    for axis in (0, 1):
+        grown = mask.copy()
+        for k in range(1, radius + 1):
+            if axis == 0:
+                grown[k:] |= mask[:-k]
+                grown[:-k] |= mask[k:]
+            else:
+                grown[:, k:] |= mask[:, :-k]
+                grown[:, :-k] |= mask[:, k:]
+        mask = grown
 
-def make_ocean_neighbors():
-    def ocean_neighbors(node):
-        return [n for n in get_neighbors(node) if n in VALID_NODES]
-    return ocean_neighbors
+    mask = mask.repeat(ratio, axis=0).repeat(ratio, axis=1)
+    return np.ascontiguousarray(mask[:shape[0], :shape[1]], dtype=np.uint8)
 
 
-# ================= COST FUNCTION =================
+def _restricted(neighbor_fn, allowed):
+    cells = memoryview(allowed.reshape(-1))
+    return lambda node: [n for n in neighbor_fn(node) if cells[n]]
 
-def time_cost(a, b, search_mode=True):
-    dist = haversine(a, b)
 
-    wave_h = weather.wave_height(*a)
-    wave_dir = weather.wave_direction(*a)
-    storm = weather.storm_risk(*a)
+def _rounded(stats):
+    # timings to 0.1 ms for reporting
+    return {k: round(v, 4) if isinstance(v, float) else v for k, v in stats.items()}
 
-    speed = speed_model.effective_speed(
-        VESSEL_SPEED_KMPH,
-        wave_h,
-        wave_dir,
-        ship_heading=None,
-        storm_risk=storm,
-    )
 
-    t = dist / speed
+def _remaining(t_end):
+    # seconds left until a perf_counter() deadline (None = no deadline)
+    return None if t_end is None else max(0.0, t_end - time.perf_counter())
 
-    if search_mode:
-        if storm > 0.3:
-            t *= (1 + storm * 1.5)
-    else:
-        if storm > 0.3:
-            t *= (1 + (storm ** 3) * 100)
-        if storm > 0.1:
-            t *= (1 + storm * 2)
 
-    return t
+class LegCancelled(Exception):
+    # a leg on the leg pool dropped at the caller's request. Not a
+    # RuntimeError, so the searches' "No route found" handling (corridor
+    # widening, failed options) never mistakes it for an infeasible leg.
+    pass
 
 
-# ================= CANAL HANDLER =================
+# ================= SEARCH ALGORITHMS =================
 
-def route_via_canal(start, goal, canal_name, side_a, side_b):
-    canal = CANALS[canal_name]
+SEARCH_ALGORITHMS = {
+    "astar": astar,
+    "bidirectional": bidirectional_astar,
+    "theta": theta_star,
+    "anytime": ara_star,
+}
 
-    a = snap_to_valid_node(snap_to_grid(canal[side_a]))
-    b = snap_to_valid_node(snap_to_grid(canal[side_b]))
+# search="ch" answers from the contraction hierarchy while the weather is
+# uniform and falls back to astar otherwise
+SEARCH_MODES = (*SEARCH_ALGORITHMS, "ch")
 
-    print(f"[INFO] Routing via {canal_name.upper()} Canal")
 
-    neighbors = make_ocean_neighbors()
+# ================= PLANNER =================
 
-    path1 = astar(
-        start, a, neighbors,
-        lambda x, y: time_cost(x, y, True),
-        VESSEL_SPEED_KMPH,
-    )
+class Planner:
+    """
+    Owns the ocean grid, weather field and speed model for one vessel
+    configuration. Nothing is read at construction: the artifacts are
+    mapped on first use or by warmup(), so several planners (e.g. grids
+    built for different drafts, or different weather snapshots) can live
+    in one process.
 
-    path2 = astar(
-        b, goal, neighbors,
-        lambda x, y: time_cost(x, y, True),
-        VESSEL_SPEED_KMPH,
-    )
+    When landmarks_file exists (python landmarks.py) searches other than
+    theta use the ALT heuristic; pass landmarks_file=None for the plain
+    great-circle bound.
+    ch_file (python contraction.py) enables search="ch". open_list picks
+    the searches' priority queue (openlist.OPEN_LISTS).
 
-    canal_jump = {
-        "from": a,
-        "to": b,
-        "canal": canal_name,
-        "penalty_hours": canal["penalty_hours"],
-    }
+    Searches read edge weights from the edge cost layer (edge_costs.py)
+    in edge_costs_file, built on first use and rebuilt whenever the
+    weather, its interpolation mode, vessel speed or speed model no
+    longer match it.
+
+    heading_aware applies the speed model's directional wave penalty:
+    grid moves at their fixed bearings through the edge cost layer, the
+    final ETA at each segment's initial bearing. Any-angle segments and
+    the coarse levels of coarse_to_fine keep heading-free cell rates.
+
+    When canal_trees_file exists (python canal_trees.py) legs that end at
+    a canal entrance, or start at one, are read off the precomputed
+    shortest-path trees instead of searched. The trees depend on the
+    search cost, so they are rebuilt (and rewritten) when weather_file or
+    any of the edge cost layer's settings change.
+
+    route_cache (a route_cache.RouteCache) makes compute_route return the
+    stored result for a request it has answered before on the same grid
+    and weather artifacts.
+
+    leg_workers > 1 runs the two legs of a canal route at the same time in
+    a process pool (default LEG_WORKERS, capped at the CPU count). Workers
+    map the same artifact files, so the grid and weather pages are shared
+    through the page cache; close() shuts the pool down.
+    """
+
+    def __init__(
+        self,
+        grid_file=GRID_FILE,
+        weather_file=WEATHER_CACHE_FILE,
+        vessel_speed_kmph=VESSEL_SPEED_KMPH,
+        speed_model=None,
+        heading_aware=HEADING_AWARE,
+        landmarks_file=LANDMARKS_FILE,
+        ch_file=CH_FILE,
+        canal_trees_file=CANAL_TREES_FILE,
+        edge_costs_file=EDGE_COSTS_FILE,
+        open_list=OPEN_LIST,
+        leg_workers=None,
+        route_cache=None,
+    ):
+        self.grid_file = grid_file
+        self.weather_file = weather_file
+        self.landmarks_file = landmarks_file
+        self.ch_file = ch_file
+        self.canal_trees_file = canal_trees_file
+        self.edge_costs_file = edge_costs_file
+        self.open_list = open_list
+        if leg_workers is None:
+            leg_workers = min(LEG_WORKERS, os.cpu_count() or 1)
+        self.leg_workers = leg_workers
+        self.route_cache = route_cache
+        self.vessel_speed_kmph = vessel_speed_kmph
+        self.speed_model = speed_model or SpeedModel()
+        self.heading_aware = heading_aware
+
+        self._grid = None
+        self._weather = None
+        self._landmarks = None
+        self._hierarchy = None
+        self._canal_trees = None
+        self._edge_costs = None
+        self._static_speed = None
+        self._rates = {}
+        self._canal_edges = None
+        self._block_rates = {}
+        self._coarse_grids = None
+        self._leg_pool = None
+        self._leg_cancel = None
+        self._leg_progress = None
+
+    @property
+    def grid(self):
+        if self._grid is None:
+            self._grid = OceanGrid.load(self.grid_file)
+            print(f"[INFO] Loaded {self._grid.num_nodes:,} valid nodes")
+        return self._grid
+
+    @property
+    def weather(self):
+        if self._weather is None:
+            self._weather = WeatherField(self.weather_file)
+        return self._weather
+
+    @property
+    def landmarks(self):
+        # optional: None when not built or built for another grid
+        if self._landmarks is None:
+            self._landmarks = False
+            if self.landmarks_file and os.path.exists(self.landmarks_file):
+                try:
+                    self._landmarks = Landmarks.load(self.landmarks_file, self.grid)
+                    print(f"[INFO] Loaded {len(self._landmarks)} ALT landmarks")
+                except RuntimeError as e:
+                    print(f"[WARN] Ignoring landmarks: {e}")
+        return self._landmarks or None
+
+    @property
+    def hierarchy(self):
+        # optional, like landmarks
+        if self._hierarchy is None:
+            self._hierarchy = False
+            if self.ch_file and os.path.exists(self.ch_file):
+                try:
+                    self._hierarchy = ContractionHierarchy.load(self.ch_file, self.grid)
+                    print(f"[INFO] Loaded contraction hierarchy ({self._hierarchy.core_size:,} core nodes)")
+                except RuntimeError as e:
+                    print(f"[WARN] Ignoring contraction hierarchy: {e}")
+        return self._hierarchy or None
+
+    @property
+    def edge_costs(self):
+        # always available: loaded when current, otherwise (re)built and saved
+        if self._edge_costs is None:
+            costs = None
+            if self.edge_costs_file and os.path.exists(self.edge_costs_file):
+                try:
+                    costs = EdgeCosts.load(self.edge_costs_file, self.grid)
+                    reason = costs.stale_for(self)
+                except RuntimeError as e:
+                    reason = str(e)
+                if reason is not None:
+                    print(f"[INFO] Rebuilding edge costs: {reason}")
+                    costs = None
+            if costs is None:
+                costs = EdgeCosts.build(self)
+                if self.edge_costs_file:
+                    costs.save(self.edge_costs_file)
+            self._edge_costs = costs
+        return self._edge_costs
+
+    @property
+    def canal_trees(self):
+        # optional, like landmarks, but rebuilt in place when stale
+        if self._canal_trees is None:
+            self._canal_trees = False
+            if self.canal_trees_file and os.path.exists(self.canal_trees_file):
+                try:
+                    trees = CanalTrees.load(self.canal_trees_file)
+                except RuntimeError as e:
+                    print(f"[WARN] Ignoring canal trees: {e}")
+                    return None
+                reason = trees.stale_for(self)
+                if reason is not None:
+                    print(f"[INFO] Rebuilding canal trees: {reason}")
+                    trees = CanalTrees.build(self, CANALS)
+                    trees.save(self.canal_trees_file)
+                self._canal_trees = trees
+                print(f"[INFO] Loaded {len(trees)} canal trees")
+        return self._canal_trees or None
+
+    def static_speed(self):
+        """
+        The search speed in km/h when it is the same in every cell (no
+        storm risk anywhere, all wave heights in one speed band), so that
+        search cost is distance / speed; None otherwise.
+        """
+        if self.heading_aware:
+            return None
+        if self._static_speed is None:
+            weather = self.weather
+            self._static_speed = False
+            if not weather.storm_risks.any():
+                heights = np.unique(weather.wave_heights).tolist()
+                heights.append(weather.DEFAULT_WAVE_HEIGHT)
+                speeds = {
+                    self.speed_model.effective_speed(self.vessel_speed_kmph, h)
+                    for h in heights
+                }
+                if len(speeds) == 1:
+                    self._static_speed = speeds.pop()
+        return self._static_speed or None
+
+    @property
+    def coarse_grids(self):
+        # [(factor, grid)] coarsest first, derived from the fine raster on first use
+        if self._coarse_grids is None:
+            grid = self.grid
+            self._coarse_grids = []
+            for resolution in COARSE_RESOLUTIONS:
+                factor = round(resolution / grid.resolution)
+                if factor > 1:
+                    coarse = grid.coarsen(factor)
+                    self._coarse_grids.append((factor, coarse))
+                    print(f"[INFO] Derived {resolution}° grid: {coarse.num_nodes:,} nodes")
+        return self._coarse_grids
+
+    @property
+    def leg_pool(self):
+        if self._leg_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            config = {
+                "grid_file": self.grid_file,
+                "weather_file": self.weather_file,
+                "vessel_speed_kmph": self.vessel_speed_kmph,
+                "speed_model": self.speed_model,
+                "heading_aware": self.heading_aware,
+                "landmarks_file": self.landmarks_file,
+                "ch_file": self.ch_file,
+                "canal_trees_file": self.canal_trees_file,
+                "edge_costs_file": self.edge_costs_file,
+                "open_list": self.open_list,
+                "leg_workers": 0,
+            }
+            import multiprocessing
+
+            # stale derived files are rebuilt here, not by every worker at once
+            self.edge_costs
+            self.canal_trees
+
+            # per in-flight leg: a flag set to make the worker drop it, and
+            # the expansions it has reported so far
+            self._leg_cancel = multiprocessing.Array("b", self.leg_workers, lock=False)
+            self._leg_progress = multiprocessing.Array("q", self.leg_workers, lock=False)
+            self._leg_pool = ProcessPoolExecutor(
+                self.leg_workers, initializer=_init_leg_worker,
+                initargs=(config, self._leg_cancel, self._leg_progress),
+            )
+        return self._leg_pool
+
+    def warmup(self):
+        self.grid
+        self.weather
+        self.landmarks
+        self.hierarchy
+        self.edge_costs
+        self.canal_trees
+        return self
+
+    def close(self):
+        if self._leg_pool is not None:
+            self._leg_pool.shutdown()
+            self._leg_pool = None
+
+    # ================= HELPERS =================
+
+    def snap_to_valid_node(self, point):
+        # returns the node id of the closest valid node
+        node = self.grid.nearest_node(*point)
+        if node is None:
+            raise RuntimeError("No valid ocean node to snap to")
+        return node
+
+    def snap_many(self, points):
+        """
+        Snap thousands of (lat, lon) points at once, e.g. a port list for a
+        bulk job. Same result as snap_to_valid_node(snap_to_grid(p)) per point.
+        Returns an int64 array of node ids.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        snapped = np.round(points / GRID_RESOLUTION) * GRID_RESOLUTION
+        nodes = self.grid.nearest_nodes(snapped[:, 0], snapped[:, 1])
+        if (nodes < 0).any():
+            raise RuntimeError("No valid ocean node to snap to")
+        return nodes
+
+    def make_ocean_neighbors(self):
+        return self.grid.neighbors
+
+    def ensure_connected(self, a, b, resnap=False):
+        """
+        O(1) reachability check on the grid's water-body labels. Nodes in
+        different water bodies raise, or with resnap the endpoint in the
+        smaller water body moves to the nearest node of the other one.
+        """
+        grid = self.grid
+        if grid.connected(a, b):
+            return a, b
+
+        if not resnap:
+            raise RuntimeError(
+                f"No route found - {grid.coord(a)} and {grid.coord(b)} "
+                f"are in disconnected water bodies"
+            )
+
+        ca, cb = grid.component(a), grid.component(b)
+        if grid.component_sizes[ca] < grid.component_sizes[cb]:
+            moved = a = grid.nearest_node(*grid.coord(a), component=cb)
+        else:
+            moved = b = grid.nearest_node(*grid.coord(b), component=ca)
+
+        print(f"[INFO] Re-snapped to connected water body: {grid.coord(moved)}")
+        return a, b
+
+    def search_cost(self, a, b):
+        # a, b are adjacent node ids: read from the edge cost layer
+        return self.edge_costs.cost(a, b)
 
-    return path1[:-1], canal_jump, path2[1:]
+    def segment_cost(self, a, b):
+        # straight a-b for any-angle search: length times the mean search
+        # time per km of the cells it crosses, None if it crosses land
+        grid = self.grid
+        cells = grid.line_cells(a, b)
+        if cells is None:
+            return None
 
+        total = sum(self.cell_rate(c) for c in cells)
+        return haversine(grid.coord(a), grid.coord(b)) * total / len(cells)
 
-# ================= MAIN API =================
+    def cell_rate(self, node):
+        # search time per km in a fine cell (weather is fixed per planner)
+        r = self._rates.get(node)
+        if r is None:
+            r = self._rates[node] = self.leg_time(1.0, self.grid.coord(node), True)
+        return r
 
-def compute_route(start, goal, smooth=True):
-    start = snap_to_valid_node(snap_to_grid(start))
-    goal  = snap_to_valid_node(snap_to_grid(goal))
+    def search_rates(self, lats, lons, headings=None):
+        # leg_time(1.0, (lat, lon), True, heading) for many points at once;
+        # headings, if given, is (points, k) and so is the result
+        wave_h, wave_dir, storm = self.weather.sample(lats, lons)
+        if headings is None:
+            wave_dir = None
+        else:
+            wave_h, wave_dir, storm = wave_h[:, None], wave_dir[:, None], storm[:, None]
+        speeds = self.speed_model.effective_speed_array(
+            self.vessel_speed_kmph, wave_h, wave_dir, headings, storm,
+        )
+        rates = 1.0 / speeds
+        return np.where(storm > 0.3, rates * (1 + storm * 1.5), rates)
+
+    def block_rate(self, factor, block):
+        # mean cell_rate over the water cells of a coarse block
+        key = (factor, block)
+        r = self._block_rates.get(key)
+        if r is None:
+            grid = self.grid
+            bi, bj = divmod(block, -(-grid.n_lon // factor))
+            window = grid.mask[bi * factor:(bi + 1) * factor, bj * factor:(bj + 1) * factor]
+            ii, jj = np.nonzero(window)
+            nodes = ((ii + bi * factor) * grid.n_lon + jj + bj * factor).tolist()
+            r = self._block_rates[key] = sum(self.cell_rate(n) for n in nodes) / len(nodes)
+        return r
 
-    print("[INFO] Snapped start:", start)
-    print("[INFO] Snapped goal :", goal)
+    def to_coords(self, path):
+        return [self.grid.coord(n) for n in path]
 
-    neighbors = make_ocean_neighbors()
-    canal_jumps = []
-    raw_path = []
+    def artifact_version(self):
+        # identifies the grid + weather a result was computed on, None if unknown
+        grid_checksum = self.grid.checksum
+        if grid_checksum is None:
+            return None
+        return f"{grid_checksum}:{self.weather.checksum}"
 
-    # ---------- PANAMA ----------
-    if (
-        in_americas(start) and in_americas(goal) and
-        ((is_pacific(start) and is_atlantic(goal)) or
-         (is_atlantic(start) and is_pacific(goal)))
+    def find_path(
+        self, start, goal, search="astar", stats=None, coarse_to_fine=False, allowed=None,
+        max_expansions=MAX_EXPANSIONS, epsilon=None, deadline_s=None, progress=None,
+        time_costs=False,
     ):
-        if is_pacific(start):
-            p1, jump, p2 = route_via_canal(start, goal, "panama", "pacific", "atlantic")
+        # node-id path between two connected nodes with the chosen algorithm;
+        # allowed: optional uint8 raster of cells the search may enter.
+        # epsilon / deadline_s turn astar into the anytime search (ara_star).
+        # progress: optional callback, see astar.astar.
+        # time_costs: also add the time spent in the cost function to stats.
+        # Legs to or from a canal entrance are walked up its canal tree
+        # (exact on the search cost) unless the search is any-angle.
+        if search not in SEARCH_MODES:
+            raise ValueError(f"Unknown search '{search}'. Choose from: {', '.join(SEARCH_MODES)}")
+
+        if search != "theta" and allowed is None and self.canal_trees is not None:
+            path = self.canal_trees.path(start, goal, self.grid.n_lon)
+            if path is not None:
+                if stats is not None:
+                    stats["tree_walks"] = stats.get("tree_walks", 0) + 1
+                return path
+
+        if epsilon is not None or deadline_s is not None:
+            if search not in ("astar", "anytime"):
+                raise ValueError(f"epsilon / deadline_s need search='astar', not '{search}'")
+            search = "anytime"
+
+        if coarse_to_fine:
+            return self.find_path_coarse_to_fine(
+                start, goal, search, stats, max_expansions, epsilon, deadline_s, progress,
+                time_costs,
+            )
+
+        if search == "ch":
+            if self.hierarchy is not None and self.static_speed() is not None:
+                return self.hierarchy.query(start, goal, self.grid.coord, stats)
+            print("[INFO] No hierarchy or non-uniform weather - falling back to A*")
+            search = "astar"
+
+        kwargs = {
+            "max_expansions": max_expansions,
+            "open_list": self.open_list,
+            "progress": progress,
+        }
+        # landmark bounds are 8-connected grid distances, which an
+        # any-angle segment can undercut
+        if self.landmarks is not None and search != "theta":
+            kwargs["heuristic_fn"] = self.landmarks.heuristic_fn(
+                start, goal, self.vessel_speed_kmph, self.grid.coord,
+            )
+        if search == "theta":
+            kwargs["segment_fn"] = self.segment_cost
+        if search == "anytime":
+            kwargs["epsilon"] = ANYTIME_EPSILON if epsilon is None else epsilon
+            kwargs["deadline_s"] = deadline_s
+
+        neighbor_fn = self.make_ocean_neighbors()
+        if allowed is not None:
+            neighbor_fn = _restricted(neighbor_fn, allowed)
+
+        cost_fn = self.edge_costs.cost
+        if stats is not None and time_costs:
+            cost_fn = timed(cost_fn, stats)
+
+        return SEARCH_ALGORITHMS[search](
+            start, goal,
+            neighbor_fn,
+            cost_fn,
+            self.vessel_speed_kmph,
+            self.grid.coord,
+            stats=stats,
+            **kwargs,
+        )
+
+    def find_path_coarse_to_fine(
+        self, start, goal, search="astar", stats=None,
+        max_expansions=MAX_EXPANSIONS, epsilon=None, deadline_s=None, progress=None,
+        time_costs=False,
+    ):
+        """
+        Solve on the coarsest derived grid first, then on each finer one
+        (the fine grid last, with the chosen search) only inside a corridor
+        of CORRIDOR_RADIUS coarse cells around the previous path. A
+        corridor without a route is widened up to CORRIDOR_MAX_RADIUS, then
+        that level is searched unrestricted. Levels on which start and goal
+        are not connected (non-navigable block) are skipped. A deadline
+        covers all levels; the fine level gets whatever is left of it.
+        """
+        t_end = None if deadline_s is None else time.perf_counter() + deadline_s
+        budget = (max_expansions, epsilon, t_end, progress, time_costs)
+        fine = self.grid
+        prev = None   # (factor, grid, path) of the last solved level
+
+        for factor, grid in self.coarse_grids + [(1, fine)]:
+            s, t = fine.block(start, factor), fine.block(goal, factor)
+            if factor > 1 and not grid.connected(s, t):
+                continue
+            level = (factor, grid)
+
+            radius = CORRIDOR_RADIUS
+            path = None
+            while prev is not None and radius <= CORRIDOR_MAX_RADIUS:
+                allowed = corridor_mask(
+                    prev[1], prev[2], radius, prev[0] // factor, (grid.n_lat, grid.n_lon),
+                )
+                try:
+                    path = self._level_path(level, s, t, search, stats, budget, allowed)
+                    break
+                except RuntimeError as e:
+                    if not str(e).startswith("No route found"):
+                        raise
+                    print(f"[INFO] No route in {radius}-cell corridor, widening")
+                    radius *= 2
+
+            if path is None:
+                path = self._level_path(level, s, t, search, stats, budget)
+            prev = (factor, grid, path)
+
+        return path
+
+    def _level_path(self, level, start, goal, search, stats, budget, allowed=None):
+        factor, grid = level
+        max_expansions, epsilon, t_end, progress, time_costs = budget
+        if factor == 1:
+            return self.find_path(
+                start, goal, search, stats, allowed=allowed, max_expansions=max_expansions,
+                epsilon=epsilon, deadline_s=_remaining(t_end), progress=progress,
+                time_costs=time_costs,
+            )
+
+        neighbor_fn = grid.neighbors
+        if allowed is not None:
+            neighbor_fn = _restricted(neighbor_fn, allowed)
+
+        # block centres rarely sit on weather samples: cost by the fine cells
+        cost_fn = lambda a, b: grid.edge_km(a, b) * self.block_rate(factor, a)
+        if stats is not None and time_costs:
+            cost_fn = timed(cost_fn, stats)
+
+        return astar(
+            start, goal, neighbor_fn,
+            cost_fn,
+            self.vessel_speed_kmph,
+            grid.coord,
+            stats=stats,
+            max_expansions=max_expansions,
+            open_list=self.open_list,
+            progress=progress,
+        )
+
+    def _parallel_legs(self, legs, stats, ends, search, coarse_to_fine, progress=None, **kwargs):
+        # find_path for every (start, goal) in ends (at most leg_workers) on
+        # the leg pool; legs and stats are filled as by _leg, then the first
+        # failure is re-raised. progress sees the legs' expansions summed.
+        pool = self.leg_pool
+        futures = []
+        for slot, (start, goal) in enumerate(ends):
+            self._leg_cancel[slot] = 0
+            self._leg_progress[slot] = 0
+            futures.append(pool.submit(_run_leg, start, goal, search, coarse_to_fine, kwargs, slot))
+
+        total = len(ends) * kwargs.get("max_expansions", MAX_EXPANSIONS)
+        pending = set(futures)
+        while pending:
+            pending = self._wait_legs(pending, range(len(ends)), progress, total)
+        if progress is not None:
+            progress(sum(self._leg_progress[:len(ends)]), total, True)
+
+        paths, error = [], None
+        for (start, goal), future in zip(ends, futures):
+            path, leg, failure = future.result()
+            merge_stats(stats, leg)
+            self._record_leg(legs, start, goal, leg)
+            paths.append(path)
+            error = error or failure
+
+        if error is not None:
+            raise error
+        return paths
+
+    def _wait_legs(self, running, slots, progress, total, finished=0):
+        # wait for some of the running leg futures to finish, passing the
+        # expansions reported in slots (plus finished) to progress every
+        # PROGRESS_POLL_S meanwhile; returns the ones still running
+        from concurrent.futures import wait, FIRST_COMPLETED
+
+        while True:
+            done, running = wait(running, timeout=PROGRESS_POLL_S, return_when=FIRST_COMPLETED)
+            if progress is not None:
+                expansions = finished + sum(self._leg_progress[slot] for slot in slots)
+                progress(expansions, total, False)
+            if done:
+                return running
+
+    def _leg(self, legs, stats, start, goal, search, coarse_to_fine, option=None, **kwargs):
+        # find_path with its own counters and timing, recorded in legs and
+        # added to stats (also when the search fails); option labels the
+        # route option the leg belongs to
+        leg = {}
+        t0 = time.perf_counter()
+        try:
+            return self.find_path(start, goal, search, leg, coarse_to_fine, **kwargs)
+        finally:
+            leg["search_s"] = time.perf_counter() - t0
+            merge_stats(stats, leg)
+            self._record_leg(legs, start, goal, leg, option)
+
+    def _record_leg(self, legs, start, goal, leg, option=None):
+        record = {"from": self.grid.coord(start), "to": self.grid.coord(goal)}
+        if option is not None:
+            record["option"] = option
+        legs.append({**record, **leg})
+
+    # ================= COST FUNCTION =================
+
+    def time_cost(self, a, b, search_mode=True):
+        heading = initial_bearing(a, b) if self.heading_aware else None
+        return self.leg_time(haversine(a, b), a, search_mode, heading)
+
+    def leg_time(self, dist, a, search_mode=True, heading=None):
+        wave_h, wave_dir, storm = self.weather.at(*a)
+
+        speed = self.speed_model.effective_speed(
+            self.vessel_speed_kmph,
+            wave_h,
+            wave_dir,
+            ship_heading=heading,
+            storm_risk=storm,
+        )
+
+        t = dist / speed
+
+        if search_mode:
+            if storm > 0.3:
+                t *= (1 + storm * 1.5)
         else:
-            p1, jump, p2 = route_via_canal(start, goal, "panama", "atlantic", "pacific")
-
-        raw_path = p1 + [jump["from"], jump["to"]] + p2
-        canal_jumps.append(jump)
-
-    # ---------- SUEZ (FIXED) ----------
-    elif (
-        # Indo-Pacific (India / China / SE Asia) ↔ Europe
-        (is_indian_indopacific(start) and is_europe_mediterranean(goal)) or
-        (is_europe_mediterranean(start) and is_indian_indopacific(goal)) or
-
-        # Local Red Sea ↔ Mediterranean
-        (
-            in_afro_eurasia(start) and in_afro_eurasia(goal) and
-            ((is_red_sea(start) and is_mediterranean(goal)) or
-             (is_mediterranean(start) and is_red_sea(goal)))
+            if storm > 0.3:
+                t *= (1 + (storm ** 3) * 100)
+            if storm > 0.1:
+                t *= (1 + storm * 2)
+
+        return t
+
+    # ================= CANAL HANDLER =================
+
+    def route_via_canal(
+        self, start, goal, canal_name, side_a, side_b,
+        resnap=False, search="astar", stats=None, coarse_to_fine=False,
+        max_expansions=MAX_EXPANSIONS, epsilon=None, deadline_s=None, progress=None,
+        time_costs=False, legs=None,
+    ):
+        # with leg_workers > 1 both legs run at once, each with the whole
+        # deadline; in-process a deadline is split between them: half for
+        # the first, the rest (including anything it left over) for the
+        # second. legs, if given, receives the per-leg stats (see _leg).
+        if legs is None:
+            legs = []
+        t_end = None if deadline_s is None else time.perf_counter() + deadline_s
+        canal = CANALS[canal_name]
+        grid = self.grid
+
+        a = self.snap_to_valid_node(snap_to_grid(canal[side_a]))
+        b = self.snap_to_valid_node(snap_to_grid(canal[side_b]))
+
+        start, a = self.ensure_connected(start, a, resnap)
+        b, goal = self.ensure_connected(b, goal, resnap)
+
+        print(f"[INFO] Routing via {canal_name.upper()} Canal")
+
+        if self.leg_workers > 1:
+            path1, path2 = self._parallel_legs(
+                legs, stats, [(start, a), (b, goal)], search, coarse_to_fine, progress,
+                max_expansions=max_expansions, epsilon=epsilon, deadline_s=deadline_s,
+                time_costs=time_costs,
+            )
+        else:
+            path1 = self._leg(
+                legs, stats, start, a, search, coarse_to_fine, max_expansions=max_expansions,
+                epsilon=epsilon, deadline_s=None if t_end is None else _remaining(t_end) / 2,
+                progress=progress, time_costs=time_costs,
+            )
+            path2 = self._leg(
+                legs, stats, b, goal, search, coarse_to_fine, max_expansions=max_expansions,
+                epsilon=epsilon, deadline_s=_remaining(t_end), progress=progress,
+                time_costs=time_costs,
+            )
+
+        canal_jump = self._canal_jump(canal_name, a, b)
+        return self.to_coords(path1[:-1]), canal_jump, self.to_coords(path2[1:])
+
+    def _canal_jump(self, canal_name, a, b):
+        return {
+            "from": self.grid.coord(a),
+            "to": self.grid.coord(b),
+            "canal": canal_name,
+            "penalty_hours": CANALS[canal_name]["penalty_hours"],
+        }
+
+    # ================= ROUTE PORTFOLIO =================
+
+    def route_options(self, start, goal, smooth=True, resnap=False, search="astar", stats=None,
+                      coarse_to_fine=False, legs=None, **budget):
+        """
+        Portfolio mode: instead of choosing a canal from region boxes, try
+        every plausible option (direct, each canal in each direction) and
+        keep the one with the lowest ETA. An option is plausible when its
+        legs join connected nodes and, for a canal, both entrances snap to
+        grid nodes within CANAL_SNAP_MAX_KM of the canal (on a regional
+        grid the nearest node can be far off). Options run cheapest lower bound first
+        (great-circle hours through the canal ends plus the penalty, which
+        no ETA can beat), leg_workers legs at a time on the leg pool when
+        leg_workers > 1; an option whose bound is already above the best
+        ETA found is not searched.
+
+        Returns (raw_path, canal_jumps, options); options lists every
+        option with its bound, ETA and status (best / ok / pruned / failed).
+        """
+        if legs is None:
+            legs = []
+
+        candidates = self._route_candidates(start, goal, smooth)
+        if not candidates:
+            start, goal = self.ensure_connected(start, goal, resnap)
+            candidates = self._route_candidates(start, goal, smooth)
+
+        if self.leg_workers > 1:
+            runner = self._run_options_parallel
+        else:
+            runner = self._run_options
+        runner(candidates, search, stats, coarse_to_fine, legs, smooth, budget)
+
+        best = min(
+            (c for c in candidates if c["status"] == "ok"),
+            key=lambda c: c["travel_time_hours"], default=None,
+        )
+        if best is None:
+            raise RuntimeError("No route found - " + "; ".join(
+                f"{c['route']}: {c.get('error', c['status'])}" for c in candidates
+            ))
+        best["status"] = "best"
+        print(f"[INFO] Best option: {best['route']} ({best['travel_time_hours']:.2f} h)")
+
+        options = [
+            {k: v for k, v in c.items() if k not in ("ends", "canal_jump", "raw_path")}
+            for c in candidates
+        ]
+        jumps = [best["canal_jump"]] if best["canal_jump"] else []
+        return best["raw_path"], jumps, options
+
+    def _route_candidates(self, start, goal, smooth):
+        # plausible options, lowest ETA bound first
+        grid = self.grid
+        options = []
+        if grid.connected(start, goal):
+            options.append(("direct", None, [(start, goal)]))
+
+        for name, canal in CANALS.items():
+            ends = {
+                side: self.snap_to_valid_node(snap_to_grid(point))
+                for side, point in canal.items() if side != "penalty_hours"
+            }
+            snap_km = max(haversine(canal[side], grid.coord(node)) for side, node in ends.items())
+            if snap_km > CANAL_SNAP_MAX_KM:
+                print(f"[INFO] Skipping {name} canal: entrance snaps {snap_km:.0f} km away")
+                continue
+            for side_a, side_b in itertools.permutations(ends, 2):
+                a, b = ends[side_a], ends[side_b]
+                if a != b and grid.connected(start, a) and grid.connected(b, goal):
+                    label = f"{name} ({side_a} → {side_b})"
+                    options.append((label, (name, a, b), [(start, a), (b, goal)]))
+
+        candidates = []
+        for label, jump, ends in options:
+            # smoothing may cut up to its tolerance off each side of a turn
+            stops = [grid.coord(n) for leg in ends for n in leg]
+            km = sum(haversine(p, q) for p, q in zip(stops, stops[1:]))
+            if smooth:
+                km -= 2 * SMOOTHING_EPSILON_KM * (len(stops) - 2)
+            bound = max(km, haversine(stops[0], stops[-1])) / self.vessel_speed_kmph
+            if jump is not None:
+                bound += CANALS[jump[0]]["penalty_hours"]
+
+            candidates.append({
+                "route": label,
+                "canal": jump[0] if jump else None,
+                "lower_bound_hours": round(bound, 2),
+                "travel_time_hours": None,
+                "status": "pending",
+                "ends": ends,
+                "canal_jump": self._canal_jump(*jump) if jump else None,
+                "raw_path": None,
+            })
+
+        candidates.sort(key=lambda c: c["lower_bound_hours"])
+        return candidates
+
+    def _finish_option(self, candidate, paths, smooth, candidates):
+        # assemble and time a searched option, then prune the pending ones
+        # whose bound it beats
+        jump = candidate["canal_jump"]
+        if jump is None:
+            raw_path = self.to_coords(paths[0])
+        else:
+            raw_path = (
+                self.to_coords(paths[0][:-1]) + [jump["from"], jump["to"]] +
+                self.to_coords(paths[1][1:])
+            )
+        smoothed = douglas_peucker(raw_path, SMOOTHING_EPSILON_KM) if smooth else raw_path
+        eta = sum((self.time_cost(p, q, False) for p, q in zip(smoothed, smoothed[1:])), 0.0)
+        if jump is not None:
+            eta += jump["penalty_hours"]
+
+        candidate.update(raw_path=raw_path, travel_time_hours=round(eta, 2), status="ok")
+
+        for other in candidates:
+            if other["status"] == "pending" and other["lower_bound_hours"] >= eta:
+                other["status"] = "pruned"
+
+    def _run_options(self, candidates, search, stats, coarse_to_fine, legs, smooth, budget):
+        for candidate in candidates:
+            if candidate["status"] != "pending":
+                continue
+            try:
+                paths = [
+                    self._leg(legs, stats, s, g, search, coarse_to_fine, candidate["route"], **budget)
+                    for s, g in candidate["ends"]
+                ]
+            except RuntimeError as e:
+                candidate.update(status="failed", error=str(e))
+                continue
+            self._finish_option(candidate, paths, smooth, candidates)
+
+    def _run_options_parallel(self, candidates, search, stats, coarse_to_fine, legs, smooth, budget):
+        # at most leg_workers legs in flight, submitted cheapest bound first,
+        # so options pruned in the meantime are never started. progress sees
+        # the expansions of all legs so far against a budget for every leg.
+        budget = dict(budget)
+        progress = budget.pop("progress", None)
+        pool, cancel = self.leg_pool, self._leg_cancel
+        queue = [(c, k) for c in candidates for k in range(len(c["ends"]))]
+        paths = {id(c): [None] * len(c["ends"]) for c in candidates}
+        free = list(range(self.leg_workers))
+        running = {}    # future -> (candidate, leg index, slot)
+        total = len(queue) * budget.get("max_expansions", MAX_EXPANSIONS)
+        finished = 0    # expansions of the legs already collected
+
+        while queue or running:
+            while queue and free:
+                candidate, k = queue.pop(0)
+                if candidate["status"] == "pending":
+                    slot = free.pop()
+                    cancel[slot] = 0
+                    self._leg_progress[slot] = 0
+                    s, g = candidate["ends"][k]
+                    future = pool.submit(_run_leg, s, g, search, coarse_to_fine, budget, slot)
+                    running[future] = (candidate, k, slot)
+            if not running:
+                break
+
+            slots = [slot for _, _, slot in running.values()]
+            still = self._wait_legs(set(running), slots, progress, total, finished)
+            for future in [f for f in running if f not in still]:
+                candidate, k, slot = running.pop(future)
+                free.append(slot)
+                path, leg, error = future.result()
+                finished += leg.get("expansions", 0)
+                s, g = candidate["ends"][k]
+                merge_stats(stats, leg)
+                self._record_leg(legs, s, g, leg, candidate["route"])
+
+                if candidate["status"] != "pending":
+                    continue
+                if isinstance(error, LegCancelled):
+                    raise error
+                if error is not None:
+                    candidate.update(status="failed", error=str(error))
+                    continue
+
+                found = paths[id(candidate)]
+                found[k] = path
+                if all(p is not None for p in found):
+                    self._finish_option(candidate, found, smooth, candidates)
+
+            # stop legs of options that were pruned or failed meanwhile
+            for other, _, slot in running.values():
+                if other["status"] != "pending":
+                    cancel[slot] = 1
+
+        if progress is not None:
+            progress(finished, total, True)
+
+    # ================= ETA MATRIX =================
+
+    def eta_matrix(self, sources, targets, paths=False, smooth=True):
+        """
+        ETA in hours from every source to every target ((lat, lon) lists),
+        as a (len(sources), len(targets)) float array, NaN where no route
+        exists. One Dijkstra per source settles all of its targets at
+        once; the canals are extra edges costing their penalty, so each
+        pair gets its best option as in portfolio mode. ETAs are computed
+        like compute_route's: on the smoothed path, with the final cost.
+
+        With leg_workers > 1 the sources are spread over the leg pool.
+        paths=True also returns an object array of the smoothed paths.
+        """
+        sources = self.snap_many(sources).tolist()
+        targets = self.snap_many(targets).tolist()
+
+        unique = list(dict.fromkeys(sources))
+        if self.leg_workers > 1 and len(unique) > 1:
+            futures = [
+                self.leg_pool.submit(_run_eta_row, s, targets, paths, smooth) for s in unique
+            ]
+            rows = dict(zip(unique, (f.result() for f in futures)))
+        else:
+            rows = {s: self.eta_row(s, targets, paths, smooth) for s in unique}
+
+        etas = np.array([rows[s][0] for s in sources], dtype=np.float64).reshape(
+            len(sources), len(targets),
         )
+        if not paths:
+            return etas
+
+        routes = np.empty(etas.shape, dtype=object)
+        for i, s in enumerate(sources):
+            for j, route in enumerate(rows[s][1]):
+                routes[i, j] = route
+        return etas, routes
+
+    def eta_row(self, source, targets, paths=False, smooth=True):
+        # (ETAs, smoothed paths or None) from one source node to target nodes
+        grid = self.grid
+        edges = self.canal_edges()
+        edge_cost = self.edge_costs.cost
+        grid_neighbors = grid.neighbors
+
+        def neighbor_fn(node):
+            jumps = edges.get(node)
+            if jumps is None:
+                return grid_neighbors(node)
+            return grid_neighbors(node) + list(jumps)
+
+        def cost_fn(a, b):
+            jumps = edges.get(a)
+            if jumps is not None and b in jumps:
+                return CANALS[jumps[b]]["penalty_hours"]
+            return edge_cost(a, b)
+
+        # water bodies the source reaches, through the canals too
+        reached = {grid.component(source)}
+        grown = True
+        while grown:
+            grown = False
+            for a, jumps in edges.items():
+                if grid.component(a) in reached:
+                    for b in jumps:
+                        if grid.component(b) not in reached:
+                            reached.add(grid.component(b))
+                            grown = True
+
+        wanted = [t for t in targets if grid.component(t) in reached]
+        dist = parent = None
+        if wanted:
+            dist, parent = dijkstra(
+                [source], neighbor_fn, cost_fn, grid.n_lat * grid.n_lon, targets=wanted,
+            )
+
+        etas, routes = [], []
+        for t in targets:
+            if dist is None or dist[t] == float("inf"):
+                etas.append(float("nan"))
+                routes.append(None)
+                continue
+
+            nodes = [t]
+            while nodes[-1] != source:
+                nodes.append(parent[nodes[-1]])
+            nodes.reverse()
+
+            raw_path = self.to_coords(nodes)
+            smoothed = douglas_peucker(raw_path, SMOOTHING_EPSILON_KM) if smooth else raw_path
+            eta = sum(self.time_cost(p, q, False) for p, q in zip(smoothed, smoothed[1:]))
+            for a, b in zip(nodes, nodes[1:]):
+                if a in edges and b in edges[a]:
+                    eta += CANALS[edges[a][b]]["penalty_hours"]
+
+            etas.append(round(eta, 2))
+            routes.append(smoothed if paths else None)
+        return etas, routes
+
+    def canal_edges(self):
+        # {entrance node: {other entrance node: canal name}}, both directions
+        if self._canal_edges is None:
+            edges = {}
+            for name, canal in CANALS.items():
+                ends = [
+                    self.snap_to_valid_node(snap_to_grid(point))
+                    for side, point in canal.items() if side != "penalty_hours"
+                ]
+                for a, b in itertools.permutations(ends, 2):
+                    if a != b:
+                        edges.setdefault(a, {})[b] = name
+            self._canal_edges = edges
+        return self._canal_edges
+
+    # ================= MAIN API =================
+
+    def compute_route(
+        self, start, goal, smooth=True, resnap=False, search="astar", stats=None,
+        coarse_to_fine=False, max_expansions=MAX_EXPANSIONS, epsilon=None, deadline_s=None,
+        progress=False, stats_log=None, portfolio=False, time_costs=False,
     ):
-        if is_indian_indopacific(start) or is_red_sea(start):
-            p1, jump, p2 = route_via_canal(start, goal, "suez", "south", "north")
+        """
+        resnap: when an endpoint lies in a water body cut off from the
+        other (lake, lagoon closed at grid resolution), move it to the
+        nearest reachable node instead of raising.
+        search: one of SEARCH_MODES, used for every leg.
+        stats: optional dict that accumulates search counters over all legs.
+        coarse_to_fine: solve each leg on the derived coarse grids first and
+        refine inside a corridor (see find_path_coarse_to_fine).
+        max_expansions: search budget per leg.
+        epsilon / deadline_s: anytime search (astar only). The first route
+        is at most epsilon times the optimum and is improved until
+        deadline_s seconds (for the whole request) have passed; the result
+        then carries the proven "suboptimality_bound".
+        progress: show a tqdm bar per search. Legs on the leg pool share
+        one bar (their expansions summed), updated every PROGRESS_POLL_S.
+        stats_log: path of a JSON-lines file the request's stats are
+        appended to.
+        portfolio: pick direct / canal by searching every plausible option
+        rather than by region boxes (see route_options); the result then
+        lists them all in "route_options". deadline_s applies per leg.
+        time_costs: also time the cost function (stats "cost_s"); off by
+        default because the clock calls slow every edge relaxation down.
+
+        The result's "stats" holds the phase timings in seconds (snap_s,
+        search_s, smooth_s, eta_s, total_s), the search counters summed
+        over all legs, one entry per leg in "legs" and peak_rss_mb, the
+        peak RSS of the whole process so far (not of this request alone).
+
+        With a route_cache, requests without a deadline are looked up by
+        their snapped endpoints and parameters first; stats["cache"] is
+        "memory", "disk" or "miss" (a hit's stats only time the lookup).
+        """
+        t_begin = time.perf_counter()
+        grid = self.grid
+        anytime = epsilon is not None or deadline_s is not None
+        legs = []
+        budget = {
+            "max_expansions": max_expansions,
+            "epsilon": epsilon,
+            "deadline_s": deadline_s,
+            "progress": tqdm_progress() if progress else None,
+            "time_costs": time_costs,
+        }
+
+        start = self.snap_to_valid_node(snap_to_grid(start))
+        goal  = self.snap_to_valid_node(snap_to_grid(goal))
+        snap_s = time.perf_counter() - t_begin
+
+        start_coord = grid.coord(start)
+        goal_coord = grid.coord(goal)
+
+        print("[INFO] Snapped start:", start_coord)
+        print("[INFO] Snapped goal :", goal_coord)
+
+        # ---------- ROUTE CACHE ----------
+        cache_key = version = None
+        if self.route_cache is not None and deadline_s is None:
+            version = self.artifact_version()
+        if version is not None:
+            cache_key = self.route_cache.make_key(
+                start=start, goal=goal, smooth=smooth, resnap=resnap, search=search,
+                coarse_to_fine=coarse_to_fine, max_expansions=max_expansions,
+                epsilon=epsilon, portfolio=portfolio,
+                vessel_speed_kmph=self.vessel_speed_kmph,
+                speed_model=type(self.speed_model).__name__,
+                heading_aware=self.heading_aware,
+                weather_interpolation=self.weather.interpolate,
+            )
+            cached, tier = self.route_cache.get(cache_key, version)
+            if cached is not None:
+                print(f"[INFO] Route cache hit ({tier})")
+                cached["stats"] = _rounded({
+                    "search": search,
+                    "cache": tier,
+                    "snap_s": snap_s,
+                    "total_s": time.perf_counter() - t_begin,
+                })
+                if stats_log:
+                    append_jsonl(stats_log, {"start": start_coord, "goal": goal_coord, **cached["stats"]})
+                return cached
+
+        canal_jumps = []
+        raw_path = []
+        options = None
+
+        # ---------- PORTFOLIO ----------
+        if portfolio:
+            raw_path, canal_jumps, options = self.route_options(
+                start, goal, smooth, resnap, search, stats, coarse_to_fine, legs, **budget,
+            )
+
+        # ---------- PANAMA ----------
+        elif (
+            in_americas(start_coord) and in_americas(goal_coord) and
+            ((is_pacific(start_coord) and is_atlantic(goal_coord)) or
+             (is_atlantic(start_coord) and is_pacific(goal_coord)))
+        ):
+            if is_pacific(start_coord):
+                sides = ("pacific", "atlantic")
+            else:
+                sides = ("atlantic", "pacific")
+            p1, jump, p2 = self.route_via_canal(
+                start, goal, "panama", *sides, resnap, search, stats, coarse_to_fine, **budget,
+                legs=legs,
+            )
+
+            raw_path = p1 + [jump["from"], jump["to"]] + p2
+            canal_jumps.append(jump)
+
+        # ---------- SUEZ (FIXED) ----------
+        elif (
+            # Indo-Pacific (India / China / SE Asia) ↔ Europe
+            (is_indian_indopacific(start_coord) and is_europe_mediterranean(goal_coord)) or
+            (is_europe_mediterranean(start_coord) and is_indian_indopacific(goal_coord)) or
+
+            # Local Red Sea ↔ Mediterranean
+            (
+                in_afro_eurasia(start_coord) and in_afro_eurasia(goal_coord) and
+                ((is_red_sea(start_coord) and is_mediterranean(goal_coord)) or
+                 (is_mediterranean(start_coord) and is_red_sea(goal_coord)))
+            )
+        ):
+            if is_indian_indopacific(start_coord) or is_red_sea(start_coord):
+                sides = ("south", "north")
+            else:
+                sides = ("north", "south")
+            p1, jump, p2 = self.route_via_canal(
+                start, goal, "suez", *sides, resnap, search, stats, coarse_to_fine, **budget,
+                legs=legs,
+            )
+
+            raw_path = p1 + [jump["from"], jump["to"]] + p2
+            canal_jumps.append(jump)
+
+        # ---------- DIRECT ----------
         else:
-            p1, jump, p2 = route_via_canal(start, goal, "suez", "north", "south")
+            start, goal = self.ensure_connected(start, goal, resnap)
+            raw_path = self.to_coords(
+                self._leg(legs, stats, start, goal, search, coarse_to_fine, **budget)
+            )
 
-        raw_path = p1 + [jump["from"], jump["to"]] + p2
-        canal_jumps.append(jump)
+        # ---------- SMOOTHING ----------
+        t0 = time.perf_counter()
+        smoothed = douglas_peucker(raw_path, SMOOTHING_EPSILON_KM) if smooth else raw_path
+        smooth_s = time.perf_counter() - t0
 
-    # ---------- DIRECT ----------
-    else:
-        raw_path = astar(
-            start, goal, neighbors,
-            lambda a, b: time_cost(a, b, True),
-            VESSEL_SPEED_KMPH,
+        # ---------- FINAL ETA ----------
+        t0 = time.perf_counter()
+        # 0.0 start: a start that snaps onto the goal still gets a float ETA
+        total_time = sum(
+            (self.time_cost(smoothed[i], smoothed[i + 1], False)
+             for i in range(len(smoothed) - 1)),
+            0.0,
         )
 
-    # ---------- SMOOTHING ----------
-    smoothed = douglas_peucker(raw_path, epsilon_km=10.0) if smooth else raw_path
+        for c in canal_jumps:
+            total_time += c["penalty_hours"]
+
+        storms = [self.weather.storm_risk(*p) for p in smoothed]
+        eta_s = time.perf_counter() - t0
+
+        # ---------- STATS ----------
+        searched = {}
+        for leg in legs:
+            merge_stats(searched, leg)
+        request_stats = _rounded({
+            "search": search,
+            "snap_s": snap_s,
+            **searched,
+            "smooth_s": smooth_s,
+            "eta_s": eta_s,
+            "total_s": time.perf_counter() - t_begin,
+            "peak_rss_mb": peak_rss_mb(),
+            "legs": [_rounded(leg) for leg in legs],
+        })
+        if cache_key is not None:
+            request_stats["cache"] = "miss"
+
+        result = {
+            "route_raw": raw_path,
+            "route_smooth": smoothed,
+            "canal_jumps": canal_jumps,
+            "travel_time_hours": round(total_time, 2),
+            "num_waypoints_raw": len(raw_path),
+            "num_waypoints_smooth": len(smoothed),
+            "max_storm_risk": round(max(storms), 2),
+            "avg_storm_risk": round(sum(storms) / len(storms), 2),
+            "high_risk_waypoints": sum(1 for s in storms if s > 0.5),
+            "stats": request_stats,
+        }
+        if anytime:
+            result["suboptimality_bound"] = round(searched.get("suboptimality", 1.0), 3)
+        if options is not None:
+            result["route_options"] = options
+
+        if cache_key is not None:
+            self.route_cache.put(
+                cache_key, version, {k: v for k, v in result.items() if k != "stats"},
+            )
+
+        if stats_log:
+            append_jsonl(stats_log, {"start": start_coord, "goal": goal_coord, **request_stats})
+        return result
+
+
+# ================= LEG WORKERS =================
 
-    # ---------- FINAL ETA ----------
-    total_time = sum(
-        time_cost(smoothed[i], smoothed[i + 1], False)
-        for i in range(len(smoothed) - 1)
+_worker_planner = None
+_worker_cancel = None
+_worker_progress = None
+
+def _init_leg_worker(config, cancel, progress):
+    # pool initializer: one planner per worker process, on the same files
+    global _worker_planner, _worker_cancel, _worker_progress
+    _worker_planner = Planner(**config).warmup()
+    _worker_cancel = cancel
+    _worker_progress = progress
+
+def _run_leg(start, goal, search, coarse_to_fine, kwargs, slot=None):
+    # (path, leg stats, RuntimeError / LegCancelled or None); failures come
+    # back as values so the leg's counters still reach the caller. With a slot, the search
+    # reports its expansions there and gives up (every LOG_EVERY
+    # expansions) once its cancel flag is set.
+    leg = {}
+    t0 = time.perf_counter()
+    if slot is not None:
+        searched = 0    # expansions of the leg's finished searches (coarse levels)
+
+        def progress(expansions, total, done):
+            nonlocal searched
+            _worker_progress[slot] = searched + expansions
+            if done:
+                searched += expansions
+            elif _worker_cancel[slot]:
+                raise LegCancelled(f"leg {slot} cancelled")
+        kwargs = {**kwargs, "progress": progress}
+    try:
+        path = _worker_planner.find_path(start, goal, search, leg, coarse_to_fine, **kwargs)
+        error = None
+    except (RuntimeError, LegCancelled) as e:
+        path, error = None, e
+    leg["search_s"] = time.perf_counter() - t0
+    return path, leg, error
+
+def _run_eta_row(source, targets, paths, smooth):
+    return _worker_planner.eta_row(source, targets, paths, smooth)
+
+
+# ================= DEFAULT PLANNER =================
+
+_default_planner = None
+
+def default_planner():
+    # shared planner on the configured artifacts, created on first use
+    global _default_planner
+    if _default_planner is None:
+        _default_planner = Planner()
+    return _default_planner
+
+def compute_route(
+    start, goal, smooth=True, resnap=False, search="astar", stats=None,
+    coarse_to_fine=False, max_expansions=MAX_EXPANSIONS, epsilon=None, deadline_s=None,
+    progress=False, stats_log=None, portfolio=False, time_costs=False,
+):
+    return default_planner().compute_route(
+        start, goal, smooth=smooth, resnap=resnap, search=search, stats=stats,
+        coarse_to_fine=coarse_to_fine, max_expansions=max_expansions,
+        epsilon=epsilon, deadline_s=deadline_s, progress=progress, stats_log=stats_log,
+        portfolio=portfolio, time_costs=time_costs,
     )
 
-    for c in canal_jumps:
-        total_time += c["penalty_hours"]
-
-    storms = [weather.storm_risk(*p) for p in smoothed]
-
-    return {
-        "route_raw": raw_path,
-        "route_smooth": smoothed,
-        "canal_jumps": canal_jumps,
-        "travel_time_hours": round(total_time, 2),
-        "num_waypoints_raw": len(raw_path),
-        "num_waypoints_smooth": len(smoothed),
-        "max_storm_risk": round(max(storms), 2),
-        "avg_storm_risk": round(sum(storms) / len(storms), 2),
-        "high_risk_waypoints": sum(1 for s in storms if s > 0.5),
-    }
+def eta_matrix(sources, targets, paths=False, smooth=True):
+    return default_planner().eta_matrix(sources, targets, paths=paths, smooth=smooth)
@@ -38,9 +38,11 @@
 
 # print(f"[OK] Precomputed {len(VALID_NODES)} valid nodes")
 
+import sys
 import pickle
-from landmask import LandMask
-from bathymetry import Bathymetry
+import numpy as np
+from grid import OceanGrid
+from config import GRID_FILE
 from multiprocessing import Pool, cpu_count
 from tqdm import tqdm
 
@@ -56,6 +58,10 @@ land_mask = None
 bathymetry = None
 
 def init_worker():
+    # geopandas / xarray are only needed here, not for --convert
+    from landmask import LandMask
+    from bathymetry import Bathymetry
+
     global land_mask, bathymetry
     land_mask = LandMask("data/ne_10m_land/ne_10m_land.shp")
     bathymetry = Bathymetry("data/bathymetry/GEBCO_2024.nc")
@@ -98,13 +104,31 @@ def main():
         pool.join()
         print("[INFO] Workers terminated.")
 
-    with open("valid_nodes_suez.pkl", "wb") as f:
-        pickle.dump(VALID_NODES, f)
-
     print(f"[OK] Precomputed {len(VALID_NODES)} valid nodes")
+    write_grid(VALID_NODES)
+
+def write_grid(nodes):
+    # raster + adjacency bitmasks + per-row edge lengths in one mmap-able file
+    grid = OceanGrid.from_nodes(nodes, GRID_RESOLUTION)
+    grid.save(GRID_FILE, meta={"vessel_draft": VESSEL_DRAFT})
+
+    edges = int(np.unpackbits(grid.adjacency).sum())
+    print(f"[OK] Grid written → {GRID_FILE} ({grid.num_nodes:,} nodes, {edges:,} directed edges)")
+    print(f"[OK] {len(grid.component_sizes) - 1:,} water bodies, "
+          f"largest {grid.component_sizes[1]:,} nodes")
+
+def convert_pickle(path):
+    # reuse a node list from an older run instead of recomputing the land mask
+    with open(path, "rb") as f:
+        nodes = pickle.load(f)
+    print(f"[INFO] Converting {len(nodes):,} nodes from {path}")
+    write_grid(nodes)
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) == 3 and sys.argv[1] == "--convert":
+        convert_pickle(sys.argv[2])
+    else:
+        main()
 
 
 # precompute_valid_nodes.py
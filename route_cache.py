@@ -0,0 +1,130 @@
+# route_cache.py
+"""
+Two-tier cache of compute_route results.
+
+    memory  LRU of the most recent results in this process
+    disk    SQLite table shared by every process that opens the same file,
+            least recently used rows evicted past max_rows
+
+Entries are keyed by the snapped endpoints and every request parameter
+that changes the route (see Planner.compute_route) together with a
+version: the checksums of the grid and weather artifacts. Lookups only
+match entries of their own version, so planners on different weather
+snapshots can share one file; entries of a snapshot nobody asks for any
+more age out of both tiers through the LRU eviction.
+
+Results are stored pickled, so every hit returns a fresh copy.
+"""
+
+import json
+import pickle
+import sqlite3
+import time
+from collections import OrderedDict
+from config import ROUTE_CACHE_SIZE, ROUTE_CACHE_MAX_ROWS
+
+# bumped when the table layout changes; older tables are dropped on open
+SCHEMA_VERSION = 2
+
+
+class RouteCache:
+    def __init__(self, path=None, size=ROUTE_CACHE_SIZE, max_rows=ROUTE_CACHE_MAX_ROWS):
+        # path=None keeps the memory tier only
+        self.path = path
+        self.size = size
+        self.max_rows = max_rows
+        self.counters = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0,
+            "stores": 0, "evictions": 0,
+        }
+
+        self._memory = OrderedDict()    # (version, key) -> pickled result
+        self._db = None
+        if path is not None:
+            db = self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                db.execute("DROP TABLE IF EXISTS routes")
+                db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS routes ("
+                " key TEXT, version TEXT, result BLOB, used REAL,"
+                " PRIMARY KEY (key, version))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS routes_used ON routes (used)")
+
+    def __len__(self):
+        if self._db is None:
+            return len(self._memory)
+        return self._db.execute("SELECT COUNT(*) FROM routes").fetchone()[0]
+
+    @staticmethod
+    def make_key(**params):
+        return json.dumps(params, sort_keys=True)
+
+    # ---------------- lookups ----------------
+
+    def get(self, key, version):
+        # (result, "memory" | "disk") or (None, None)
+        blob = self._memory.get((version, key))
+        if blob is not None:
+            self._memory.move_to_end((version, key))
+            self.counters["memory_hits"] += 1
+            return pickle.loads(blob), "memory"
+
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT result FROM routes WHERE key = ? AND version = ?", (key, version),
+            ).fetchone()
+            if row is not None:
+                self._db.execute(
+                    "UPDATE routes SET used = ? WHERE key = ? AND version = ?",
+                    (time.time(), key, version),
+                )
+                self._remember((version, key), row[0])
+                self.counters["disk_hits"] += 1
+                return pickle.loads(row[0]), "disk"
+
+        self.counters["misses"] += 1
+        return None, None
+
+    def put(self, key, version, result):
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember((version, key), blob)
+        self.counters["stores"] += 1
+
+        if self._db is not None:
+            db = self._db
+            db.execute(
+                "INSERT OR REPLACE INTO routes (key, version, result, used) VALUES (?, ?, ?, ?)",
+                (key, version, blob, time.time()),
+            )
+            excess = db.execute("SELECT COUNT(*) FROM routes").fetchone()[0] - self.max_rows
+            if excess > 0:
+                db.execute(
+                    "DELETE FROM routes WHERE rowid IN "
+                    "(SELECT rowid FROM routes ORDER BY used LIMIT ?)", (excess,),
+                )
+                self.counters["evictions"] += excess
+
+    def clear(self):
+        self._memory.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM routes")
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ---------------- internals ----------------
+
+    def _remember(self, entry, blob):
+        if self.size <= 0:
+            return
+        self._memory[entry] = blob
+        self._memory.move_to_end(entry)
+        while len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
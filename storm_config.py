@@ -1,6 +1,7 @@
 
 import csv
 import os
+from config import WEATHER_CACHE_FILE
 
 STORM_DATA_FILE = "storm_data.csv"  # Your storm data source
 
@@ -121,20 +122,35 @@ def create_default_storm_csv(filename):
 
 
 # ============================================================
-# LOAD STORMS (EXECUTED AUTOMATICALLY ON IMPORT)
+# LOAD STORMS (ON FIRST ACCESS OF STORM_CENTERS / STORM_PRESET)
 # ============================================================
-print("\n" + "="*70)
-print("LOADING STORM DATA FROM CSV")
-print("="*70)
-print(f"Reading: {STORM_DATA_FILE}")
-print()
+_storm_centers = None
 
-STORM_CENTERS = load_storms_from_csv(STORM_DATA_FILE)
-STORM_PRESET = f"csv_based_{len(STORM_CENTERS)}_storms"
 
-print()
-print(f"📊 Summary: {len(STORM_CENTERS)} active storm(s) loaded")
-print("="*70 + "\n")
+def get_storm_centers():
+    global _storm_centers
+    if _storm_centers is None:
+        print("\n" + "="*70)
+        print("LOADING STORM DATA FROM CSV")
+        print("="*70)
+        print(f"Reading: {STORM_DATA_FILE}")
+        print()
+
+        _storm_centers = load_storms_from_csv(STORM_DATA_FILE)
+
+        print()
+        print(f"📊 Summary: {len(_storm_centers)} active storm(s) loaded")
+        print("="*70 + "\n")
+    return _storm_centers
+
+
+def __getattr__(name):
+    # importing the module stays silent; the CSV is read when a storm setting is used
+    if name == "STORM_CENTERS":
+        return get_storm_centers()
+    if name == "STORM_PRESET":
+        return f"csv_based_{len(get_storm_centers())}_storms"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ============================================================
@@ -143,5 +159,5 @@ print("="*70 + "\n")
 WEATHER_RESOLUTION = 0.25  # Grid resolution in degrees
 WEATHER_LAT_RANGE = (-10, 80)
 WEATHER_LON_RANGE = (25, 180)
-WEATHER_OUTPUT_FILE = "weather_cache.pkl"
+WEATHER_OUTPUT_FILE = WEATHER_CACHE_FILE
 
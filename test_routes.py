@@ -111,7 +111,8 @@ def run_test(test):
     result = compute_route(
         test["start"],
         test["goal"],
-        smooth=True
+        smooth=True,
+        progress=True,
     )
 
     output = {
@@ -1,7 +1,6 @@
 # visualize_route.py
 
 import json
-import folium
 import webbrowser
 import os
 
@@ -11,6 +10,9 @@ def visualize_route(
     output_html="route_map.html",
     open_browser=True,
 ):
+    # folium is only imported when a map is actually drawn
+    import folium
+
     # ================= LOAD DATA =================
     with open(route_json_path, "r") as f:
         data = json.load(f)
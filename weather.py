@@ -1,5 +1,11 @@
-import pickle
 import math
+from collections import namedtuple
+import numpy as np
+from artifacts import save_artifact, load_artifact
+from config import WEATHER_INTERPOLATION
+
+WEATHER_ARTIFACT_KIND = "weather"
+WEATHER_ARTIFACT_VERSION = 1
 
 # ======================================================
 # SPEED MODEL
@@ -48,32 +54,205 @@ class SpeedModel:
 
         return max(speed, 1.0)
 
+    def effective_speed_array(
+        self,
+        base_speed_kmph,
+        wave_height,
+        wave_dir=None,
+        ship_heading=None,
+        storm_risk=0.0,
+    ):
+        """
+        effective_speed over NumPy arrays (broadcast together), bit for bit
+        the same per element. A NaN wave_dir or ship_heading element skips
+        the directional penalty, like None in the scalar version. Models
+        that override effective_speed must override this too.
+        """
+        wave_height = np.asarray(wave_height, dtype=np.float64)
+        storm_risk = np.asarray(storm_risk, dtype=np.float64)
+
+        # factors of 1.0 leave the product unchanged, so every element sees
+        # the same sequence of multiplications as the scalar branches
+        speed = base_speed_kmph * np.select(
+            [wave_height < 1.0, wave_height < 2.5, wave_height < 4.0],
+            [1.0, 0.9, 0.75], 0.6,
+        )
+
+        if wave_dir is not None and ship_heading is not None:
+            rel = np.abs(np.asarray(wave_dir, dtype=np.float64) - ship_heading) % 360
+            rel = np.minimum(rel, 360 - rel)
+            speed = speed * np.select([rel < 45, rel < 90], [0.85, 0.93], 1.0)
+
+        speed = speed * np.select(
+            [storm_risk > 0.9, storm_risk > 0.5, storm_risk > 0.2],
+            [0.1, 0.4, 0.7], 1.0,
+        )
+        speed = speed * np.maximum(1.0 - 0.4 * storm_risk, 0.1)
+
+        return np.maximum(speed, 1.0)
+
 
 # ======================================================
 # WEATHER FIELD (CACHED LOOKUP) - OPTIMIZED
 # ======================================================
 
+# batch lookup result: one array per variable (WeatherField.sample)
+WeatherSample = namedtuple("WeatherSample", "wave_height wave_dir storm_risk")
+
+# math.atan2 over arrays: np.arctan2 can differ from it in the last bit,
+# which would make sample() disagree with the scalar _blend
+_atan2 = np.frompyfunc(math.atan2, 2, 1)
+
+
 class WeatherField:
-    def __init__(self, cache_file):
+    """
+    Weather grid memory-mapped from a binary artifact: one 2-D float32
+    array per variable over a regular lat/lon grid with origin
+    (lat0, lon0) and spacing `resolution` degrees.
+
+    A point belongs to the field when its nearest sample is inside the
+    grid. It reads that sample, or with interpolate=True the bilinear
+    blend of the four samples around it (wave direction blended as a
+    unit vector, edges clamped). Points outside get the defaults below.
+    """
+
+    # returned for points outside the field
+    DEFAULT_WAVE_HEIGHT = 2.0
+
+    def __init__(self, cache_file, interpolate=WEATHER_INTERPOLATION):
         print(f"[INFO] Loading weather cache from {cache_file}...")
-        with open(cache_file, "rb") as f:
-            self.data = pickle.load(f)
-        print(f"[INFO] Weather cache loaded: {len(self.data):,} grid points")
+        art = load_artifact(cache_file, WEATHER_ARTIFACT_KIND, WEATHER_ARTIFACT_VERSION)
+
+        self.lat0 = art.meta["lat0"]
+        self.lon0 = art.meta["lon0"]
+        self.resolution = art.meta["resolution"]
+        self.checksum = art.checksum
+
+        self.wave_heights = art["wave_height"]
+        self.wave_dirs = art["wave_dir"]
+        self.storm_risks = art["storm_risk"]
+        self.n_lat, self.n_lon = self.storm_risks.shape
+        self.interpolate = interpolate
+        self._inv_res = 1.0 / self.resolution
+
+        # memoryview indexing returns plain floats for the scalar lookups
+        self._wave_h = memoryview(self.wave_heights.reshape(-1))
+        self._wave_dir = memoryview(self.wave_dirs.reshape(-1))
+        self._storm = memoryview(self.storm_risks.reshape(-1))
 
-    def _key(self, lat, lon):
-        # Round to match cache resolution (1 decimal = 0.1 degree)
-        return (round(lat, 1), round(lon, 1))
+        print(f"[INFO] Weather cache loaded: {self.n_lat * self.n_lon:,} grid points")
+
+    def _index(self, lat, lon):
+        # flat index of the nearest sample, None outside the field
+        x = (lat - self.lat0) * self._inv_res + 0.5
+        y = (lon - self.lon0) * self._inv_res + 0.5
+        if x < 0 or y < 0:
+            return None
+        i, j = int(x), int(y)
+        if i >= self.n_lat or j >= self.n_lon:
+            return None
+        return i * self.n_lon + j
+
+    def at(self, lat, lon):
+        # (wave height, wave direction, storm risk) for one point
+        if self.interpolate:
+            return self._blend(lat, lon)
+        k = self._index(lat, lon)
+        if k is None:
+            return self.DEFAULT_WAVE_HEIGHT, None, 0.0
+        return self._wave_h[k], self._wave_dir[k], self._storm[k]
 
     def wave_height(self, lat, lon):
-        return self.data.get(self._key(lat, lon), {}).get("wave_height", 2.0)
+        return self.at(lat, lon)[0]
 
     def wave_direction(self, lat, lon):
-        return self.data.get(self._key(lat, lon), {}).get("wave_dir")
+        return self.at(lat, lon)[1]
 
     def storm_risk(self, lat, lon):
-        # Direct lookup - no iteration needed!
-        key = self._key(lat, lon)
-        return self.data.get(key, {}).get("storm_risk", 0.0)
+        return self.at(lat, lon)[2]
+
+    def _blend(self, lat, lon):
+        if self._index(lat, lon) is None:
+            return self.DEFAULT_WAVE_HEIGHT, None, 0.0
+        fi = min(max((lat - self.lat0) * self._inv_res, 0.0), self.n_lat - 1)
+        fj = min(max((lon - self.lon0) * self._inv_res, 0.0), self.n_lon - 1)
+        i0 = min(int(fi), max(self.n_lat - 2, 0))
+        j0 = min(int(fj), max(self.n_lon - 2, 0))
+        i1, j1 = min(i0 + 1, self.n_lat - 1), min(j0 + 1, self.n_lon - 1)
+        ti, tj = fi - i0, fj - j0
+
+        wave = storm = dx = dy = 0.0
+        for i, wi in ((i0, 1 - ti), (i1, ti)):
+            for j, wj in ((j0, 1 - tj), (j1, tj)):
+                w = wi * wj
+                if w == 0.0:
+                    continue
+                k = i * self.n_lon + j
+                wave += w * self._wave_h[k]
+                storm += w * self._storm[k]
+                a = math.radians(self._wave_dir[k])
+                dx += w * math.cos(a)
+                dy += w * math.sin(a)
+        return wave, math.degrees(math.atan2(dy, dx)) % 360, storm
+
+    def sample(self, lats, lons):
+        """
+        All variables for many points in one call: a WeatherSample of
+        float arrays shaped like lats / lons (wave_dir NaN outside the
+        field, where the scalar lookups return None).
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        fi = (lats - self.lat0) * self._inv_res
+        fj = (lons - self.lon0) * self._inv_res
+        i = np.floor(fi + 0.5)
+        j = np.floor(fj + 0.5)
+        inside = (i >= 0) & (i < self.n_lat) & (j >= 0) & (j < self.n_lon)
+
+        if self.interpolate:
+            fi = np.clip(fi, 0, self.n_lat - 1)
+            fj = np.clip(fj, 0, self.n_lon - 1)
+            i0 = np.minimum(fi.astype(np.int64), max(self.n_lat - 2, 0))
+            j0 = np.minimum(fj.astype(np.int64), max(self.n_lon - 2, 0))
+            ti, tj = fi - i0, fj - j0
+            i1 = np.minimum(i0 + 1, self.n_lat - 1)
+            j1 = np.minimum(j0 + 1, self.n_lon - 1)
+            # same corner order, float64 math and zero-weight skips as _blend
+            wave, storm, dx, dy = (np.zeros(fi.shape) for _ in range(4))
+            for a, wa in ((i0, 1 - ti), (i1, ti)):
+                for b, wb in ((j0, 1 - tj), (j1, tj)):
+                    w = wa * wb
+                    used = w != 0.0
+                    rad = np.radians(self.wave_dirs[a, b].astype(np.float64))
+                    wave += np.where(used, w * self.wave_heights[a, b].astype(np.float64), 0.0)
+                    storm += np.where(used, w * self.storm_risks[a, b].astype(np.float64), 0.0)
+                    dx += np.where(used, w * np.cos(rad), 0.0)
+                    dy += np.where(used, w * np.sin(rad), 0.0)
+            wave_dir = np.degrees(_atan2(dy, dx).astype(np.float64)) % 360
+        else:
+            a = np.where(inside, i, 0).astype(np.int64)
+            b = np.where(inside, j, 0).astype(np.int64)
+            wave = self.wave_heights[a, b].astype(np.float64)
+            wave_dir = self.wave_dirs[a, b].astype(np.float64)
+            storm = self.storm_risks[a, b].astype(np.float64)
+
+        return WeatherSample(
+            np.where(inside, wave, self.DEFAULT_WAVE_HEIGHT),
+            np.where(inside, wave_dir, np.nan),
+            np.where(inside, storm, 0.0),
+        )
+
+
+def save_weather_cache(path, lat0, lon0, resolution, wave_height, wave_dir, storm_risk, meta=None):
+    return save_artifact(
+        path, WEATHER_ARTIFACT_KIND, WEATHER_ARTIFACT_VERSION,
+        {
+            "wave_height": np.asarray(wave_height, dtype=np.float32),
+            "wave_dir": np.asarray(wave_dir, dtype=np.float32),
+            "storm_risk": np.asarray(storm_risk, dtype=np.float32),
+        },
+        meta={"lat0": lat0, "lon0": lon0, "resolution": resolution, **(meta or {})},
+    )
 
 
 # ======================================================
@@ -84,13 +263,11 @@ def build_dummy_weather_cache(
     lat_min, lat_max, lon_min, lon_max,
     storm_center=(10.0, 85.0),
     storm_radius_km=600,
-    output="weather_cache.pkl",
+    output="weather_cache.bin",
     resolution=1.0,
     storm_intensity_multiplier=1.0  # NEW: Control storm strength
 ):
     
-    data = {}
-
     def haversine(a, b):
         R = 6371
         lat1, lon1 = map(math.radians, a)
@@ -110,8 +287,14 @@ def build_dummy_weather_cache(
     print(f"[INFO] STORM RADIUS: {storm_radius_km} km")
     print(f"[INFO] STORM INTENSITY: {storm_intensity_multiplier}x")
     
-    for lat in range(int(lat_min), int(lat_max), step):
-        for lon in range(int(lon_min), int(lon_max), step):
+    lats = range(int(lat_min), int(lat_max), step)
+    lons = range(int(lon_min), int(lon_max), step)
+    wave_hs = np.zeros((len(lats), len(lons)))
+    wave_dirs = np.zeros((len(lats), len(lons)))
+    storm_risks = np.zeros((len(lats), len(lons)))
+
+    for i, lat in enumerate(lats):
+        for j, lon in enumerate(lons):
             lat_f = float(lat)
             lon_f = float(lon)
 
@@ -131,15 +314,15 @@ def build_dummy_weather_cache(
             else:
                 storm_risk = 0.0
 
-            data[(round(lat_f, 1), round(lon_f, 1))] = {
-                "wave_height": wave_h,
-                "wave_dir": wave_dir,
-                "storm_risk": storm_risk,
-            }
+            wave_hs[i, j] = wave_h
+            wave_dirs[i, j] = wave_dir
+            storm_risks[i, j] = storm_risk
             total_points += 1
 
-    with open(output, "wb") as f:
-        pickle.dump(data, f)
+    save_weather_cache(
+        output, float(int(lat_min)), float(int(lon_min)), float(step),
+        wave_hs, wave_dirs, storm_risks,
+    )
 
     print(f"[OK] Weather cache written → {output}")
     print(f"[OK] Total grid points: {total_points:,}")